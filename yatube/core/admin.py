@@ -0,0 +1,21 @@
+from django.contrib import admin
+
+from .models import Blob, Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    """Поля модели Job доступные в admin"""
+    list_display = ('pk', 'queue', 'name', 'status', 'attempts', 'run_at',)
+    list_filter = ('queue', 'status',)
+    search_fields = ('name',)
+
+
+class BlobAdmin(admin.ModelAdmin):
+    """Поля модели Blob доступные в admin"""
+    list_display = ('name', 'size', 'references', 'created',)
+    search_fields = ('name',)
+    readonly_fields = ('name', 'size', 'references', 'created',)
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(Blob, BlobAdmin)
@@ -0,0 +1,165 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.sqlite import get_pragmas, pragma_statements
+
+# Как у Django по умолчанию: журнал отката, synchronous=FULL и
+# ожидание блокировки 5 секунд (timeout в sqlite3.connect).
+DEFAULT_PROFILE = {'busy_timeout': 5000}
+TEXT = 'Тестовый пост ' * 20
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(
+        path, isolation_level=None, check_same_thread=False
+    )
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement)
+    return connection
+
+
+def p95(values):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает параллельные чтение и запись в SQLite с настройками '
+            'по умолчанию и с SQLITE_PRAGMAS.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers',
+            type=int,
+            default=4,
+            help='Количество читающих потоков.',
+        )
+        parser.add_argument(
+            '--writers',
+            type=int,
+            default=2,
+            help='Количество пишущих потоков.',
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Длительность прогона каждого профиля в секундах.',
+        )
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Сколько постов создать перед прогоном.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для сохранения результатов в JSON.',
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, pragmas in (
+            ('default', DEFAULT_PROFILE),
+            ('tuned', get_pragmas()),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'benchmark.sqlite3')
+                self.prepare(path, pragmas, options['rows'])
+                results[name] = self.run(path, pragmas, options)
+            self.stdout.write(
+                f'{name:8} чтений/с {results[name]["reads_per_sec"]:>9} '
+                f'p95 {results[name]["read_p95_ms"]} мс | '
+                f'записей/с {results[name]["writes_per_sec"]:>7} '
+                f'p95 {results[name]["write_p95_ms"]} мс | '
+                f'ошибок {results[name]["errors"]}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
+        self.stdout.write(self.style.SUCCESS('Готово.'))
+
+    def prepare(self, path, pragmas, rows):
+        connection = connect(path, pragmas)
+        connection.execute(
+            'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+            'text TEXT, pub_date REAL)'
+        )
+        connection.execute('CREATE INDEX post_author ON post (author_id)')
+        connection.execute('BEGIN')
+        connection.executemany(
+            'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)',
+            ((row % 100, TEXT, time.time()) for row in range(rows)),
+        )
+        connection.execute('COMMIT')
+        connection.close()
+
+    def run(self, path, pragmas, options):
+        stop = threading.Event()
+        timings = {'read': [], 'write': []}
+        errors = []
+        lock = threading.Lock()
+
+        def read(connection, number):
+            connection.execute(
+                'SELECT id, text FROM post WHERE author_id = ? '
+                'ORDER BY pub_date DESC LIMIT 10',
+                (number % 100,),
+            ).fetchall()
+
+        def write(connection, number):
+            connection.execute(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)',
+                (number % 100, TEXT, time.time()),
+            )
+
+        def worker(kind, operation):
+            connection = connect(path, pragmas)
+            local, number = [], 0
+            try:
+                while not stop.is_set():
+                    number += 1
+                    started = time.perf_counter()
+                    try:
+                        operation(connection, number)
+                    except sqlite3.OperationalError as error:
+                        with lock:
+                            errors.append(str(error))
+                        continue
+                    local.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+                with lock:
+                    timings[kind].extend(local)
+
+        threads = [
+            threading.Thread(target=worker, args=('read', read))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('write', write))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        duration = options['duration']
+        return {
+            'pragmas': pragmas,
+            'reads_per_sec': round(len(timings['read']) / duration),
+            'read_p95_ms': p95(timings['read']),
+            'writes_per_sec': round(len(timings['write']) / duration),
+            'write_p95_ms': p95(timings['write']),
+            'errors': len(errors),
+        }
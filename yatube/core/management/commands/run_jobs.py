@@ -0,0 +1,90 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from core.queue import DEFAULT_QUEUE, work
+
+
+class Command(BaseCommand):
+    help = 'Обработчик локальной очереди фоновых задач.'
+    stopping = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help='Очередь для обработки, можно указать несколько раз. '
+                 'По умолчанию — все очереди из JOB_QUEUES.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Сколько задач очереди брать за один раз.',
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Количество потоков обработчика.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда задач нет.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать готовые задачи и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        queues = options['queues'] or list(
+            getattr(settings, 'JOB_QUEUES', {}) or [DEFAULT_QUEUE]
+        )
+        self.processed = 0
+        self.lock = threading.Lock()
+        threads = [
+            threading.Thread(target=self.loop, args=(queues, options))
+            for _ in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stopping = True
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {self.processed}'
+        ))
+
+    def loop(self, queues, options):
+        try:
+            while not self.stopping:
+                try:
+                    processed = work(queues, options['batch_size'])
+                except OperationalError as error:
+                    # SQLite отвечает «database is locked», пока пишет
+                    # другой процесс: пропускаем проход, а не падаем.
+                    # Взятые задачи вернёт release_stale().
+                    self.stderr.write(f'Ошибка базы, повтор: {error}')
+                    time.sleep(options['sleep'])
+                    continue
+                with self.lock:
+                    self.processed += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        finally:
+            connection.close()
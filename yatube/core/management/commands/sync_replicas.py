@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY_DATABASE, get_replicas
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в реплики из DATABASE_REPLICAS '
+            '(замена репликации при локальной разработке).')
+
+    def handle(self, *args, **options):
+        primary = connections[PRIMARY_DATABASE]
+        replicas = get_replicas()
+        if not replicas:
+            raise CommandError('Реплики не настроены: YATUBE_DB_REPLICAS.')
+        for alias in [PRIMARY_DATABASE] + replicas:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'База {alias} — не SQLite.')
+        primary.ensure_connection()
+        for alias in replicas:
+            replica = connections[alias]
+            replica.ensure_connection()
+            # Онлайн-копия через backup API SQLite: основная база
+            # остаётся доступной на запись.
+            primary.connection.backup(replica.connection)
+            self.stdout.write(self.style.SUCCESS(
+                f'{alias} обновлена из {PRIMARY_DATABASE}.'
+            ))
@@ -0,0 +1,274 @@
+"""Метрики view: число запросов, гистограмма времени ответа, время
+базы и шаблонов.
+
+Каждый процесс копит метрики в памяти (Registry) и не чаще раза в
+METRICS_FLUSH_INTERVAL секунд сохраняет их в METRICS_DIR файлом
+metrics-<pid>.json. Страница /metrics складывает файлы всех процессов
+и отдаёт сумму в текстовом формате Prometheus. Файлы завершившихся
+процессов удаляет при старте каждый новый процесс (remove_stale_files),
+иначе после перезапусков воркеров их метрики суммировались бы вечно.
+
+Время шаблонов считается обёрткой над Template.render бэкенда
+Django: вложенные отрисовки (render_to_string внутри тега) не
+учитываются дважды.
+"""
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.template.backends.django import Template
+
+from .middleware import QueryCounter, count_queries
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+UNRESOLVED_VIEW: str = '<unresolved>'
+METRIC_PREFIX: str = 'yatube'
+
+_local = threading.local()
+
+
+def get_buckets():
+    return tuple(getattr(settings, 'METRICS_BUCKETS', DEFAULT_BUCKETS))
+
+
+class Registry:
+    """Метрики view текущего процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.flushed_at = 0.0
+
+    def _empty(self):
+        return {
+            'count': 0,
+            'errors': 0,
+            'duration': 0.0,
+            'buckets': [0] * len(get_buckets()),
+            'db_duration': 0.0,
+            'db_queries': 0,
+            'template_duration': 0.0,
+        }
+
+    def observe(self, view, duration, status, db_duration=0.0,
+                db_queries=0, template_duration=0.0):
+        """Учитывает один запрос к view."""
+        with self.lock:
+            stats = self.views.setdefault(view, self._empty())
+            stats['count'] += 1
+            stats['errors'] += status >= 500
+            stats['duration'] += duration
+            for index, bound in enumerate(get_buckets()):
+                if duration <= bound:
+                    stats['buckets'][index] += 1
+                    break
+            stats['db_duration'] += db_duration
+            stats['db_queries'] += db_queries
+            stats['template_duration'] += template_duration
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.views))
+
+    def reset(self):
+        with self.lock:
+            self.views = {}
+            self.flushed_at = 0.0
+
+    def flush(self):
+        """Сохраняет метрики процесса в METRICS_DIR."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        data = {'buckets': get_buckets(), 'views': self.snapshot()}
+        # Запись через временный файл: читатель не увидит половину.
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, 'w') as output:
+            json.dump(data, output)
+        os.replace(
+            temporary, os.path.join(directory, f'metrics-{os.getpid()}.json')
+        )
+        self.flushed_at = time.monotonic()
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+        if time.monotonic() - self.flushed_at >= interval:
+            self.flush()
+
+
+registry = Registry()
+atexit.register(registry.flush)
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Процесс есть, но принадлежит другому пользователю.
+        return True
+    return True
+
+
+def remove_stale_files():
+    """Удаляет из METRICS_DIR файлы процессов, которых уже нет."""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    # Сигнал 0 проверяет процесс только в POSIX: в Windows os.kill
+    # завершил бы его.
+    if not directory or os.name != 'posix' or not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        pid = name[len('metrics-'):-len('.json')]
+        if not (name.startswith('metrics-') and name.endswith('.json')
+                and pid.isdigit()):
+            continue
+        if not _process_exists(int(pid)):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def collect():
+    """Сумма метрик всех процессов, записавших файлы в METRICS_DIR."""
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return registry.snapshot()
+    registry.flush()
+    total = {}
+    for name in os.listdir(directory):
+        if not (name.startswith('metrics-') and name.endswith('.json')):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as source:
+                data = json.load(source)
+        except (OSError, ValueError):
+            continue
+        if tuple(data['buckets']) != get_buckets():
+            continue
+        for view, stats in data['views'].items():
+            merged = total.setdefault(view, registry._empty())
+            for key, value in stats.items():
+                if key == 'buckets':
+                    merged[key] = [a + b for a, b in zip(merged[key], value)]
+                else:
+                    merged[key] += value
+    return total
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(views):
+    """Метрики в текстовом формате Prometheus."""
+    lines = []
+
+    def family(name, kind, help_text):
+        lines.append(f'# HELP {METRIC_PREFIX}_{name} {help_text}')
+        lines.append(f'# TYPE {METRIC_PREFIX}_{name} {kind}')
+
+    def sample(name, labels, value):
+        label_text = ','.join(
+            f'{key}="{_escape(str(label))}"' for key, label in labels
+        )
+        lines.append(f'{METRIC_PREFIX}_{name}{{{label_text}}} {value}')
+
+    ordered = sorted(views.items())
+    family('requests_total', 'counter', 'Requests by view.')
+    for view, stats in ordered:
+        sample('requests_total', [('view', view)], stats['count'])
+    family('request_errors_total', 'counter', 'Responses 5xx by view.')
+    for view, stats in ordered:
+        sample('request_errors_total', [('view', view)], stats['errors'])
+    family('request_duration_seconds', 'histogram',
+           'Response time by view.')
+    for view, stats in ordered:
+        cumulative = 0
+        for bound, count in zip(get_buckets(), stats['buckets']):
+            cumulative += count
+            sample('request_duration_seconds_bucket',
+                   [('view', view), ('le', bound)], cumulative)
+        sample('request_duration_seconds_bucket',
+               [('view', view), ('le', '+Inf')], stats['count'])
+        sample('request_duration_seconds_sum', [('view', view)],
+               round(stats['duration'], 6))
+        sample('request_duration_seconds_count', [('view', view)],
+               stats['count'])
+    family('db_duration_seconds_total', 'counter',
+           'Database time by view.')
+    for view, stats in ordered:
+        sample('db_duration_seconds_total', [('view', view)],
+               round(stats['db_duration'], 6))
+    family('db_queries_total', 'counter', 'SQL queries by view.')
+    for view, stats in ordered:
+        sample('db_queries_total', [('view', view)], stats['db_queries'])
+    family('template_duration_seconds_total', 'counter',
+           'Template rendering time by view.')
+    for view, stats in ordered:
+        sample('template_duration_seconds_total', [('view', view)],
+               round(stats['template_duration'], 6))
+    return '\n'.join(lines) + '\n'
+
+
+def instrument_templates():
+    """Оборачивает Template.render, чтобы считать время шаблонов."""
+    render = Template.render
+    if getattr(render, 'instrumented', False):
+        return
+
+    @wraps(render)
+    def timed_render(self, context=None, request=None):
+        stats = getattr(_local, 'stats', None)
+        if stats is None or stats['depth']:
+            return render(self, context, request)
+        stats['depth'] += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            stats['template_duration'] += time.perf_counter() - started
+            stats['depth'] -= 1
+
+    timed_render.instrumented = True
+    Template.render = timed_render
+
+
+class MetricsMiddleware:
+    """Собирает метрики каждого запроса по имени view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+        remove_stale_files()
+
+    def __call__(self, request):
+        _local.stats = {'depth': 0, 'template_duration': 0.0}
+        counter = QueryCounter()
+        started = time.perf_counter()
+        try:
+            with count_queries(counter):
+                response = self.get_response(request)
+        finally:
+            stats = _local.stats
+            _local.stats = None
+        match = getattr(request, 'resolver_match', None)
+        registry.observe(
+            match.view_name if match else UNRESOLVED_VIEW,
+            time.perf_counter() - started,
+            response.status_code,
+            db_duration=counter.duration,
+            db_queries=counter.count,
+            template_duration=stats['template_duration'],
+        )
+        registry.maybe_flush()
+        return response
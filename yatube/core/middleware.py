@@ -0,0 +1,147 @@
+"""Middleware работы с базой: бюджеты запросов и выбор реплики.
+
+QueryBudgetMiddleware считает запросы и время базы через
+connection.execute_wrapper (без DEBUG и без хранения текста запросов),
+отдаёт их в заголовке Server-Timing и проверяет бюджет из настройки
+QUERY_BUDGETS: {'posts:index': 6, ...}. При превышении бюджета пишет
+предупреждение в лог, а при QUERY_BUDGET_RAISE = True выбрасывает
+QueryBudgetExceeded — так бюджеты проверяются в тестах.
+
+Запросы, выполненные при отдаче StreamingHttpResponse, уже после
+выхода из view, не учитываются.
+
+ReplicaMiddleware направляет чтение read-only страниц в реплики
+(core.routers).
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import start_replica_reads, stop_replica_reads
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class QueryBudgetExceeded(Exception):
+    """View выполнила больше запросов, чем разрешено бюджетом."""
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper: число запросов и время базы."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+@contextmanager
+def count_queries(counter):
+    """Подключает counter ко всем соединениям с базой."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+
+
+def get_budget(view_name):
+    """Бюджет запросов view или None, если он не задан."""
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name)
+
+
+def add_server_timing(response, *metrics):
+    """Дописывает метрики в заголовок Server-Timing ответа."""
+    values = [response['Server-Timing']] if response.has_header(
+        'Server-Timing'
+    ) else []
+    response['Server-Timing'] = ', '.join(values + list(metrics))
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к базе и проверяет бюджет запросов view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with count_queries(counter):
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        add_server_timing(
+            response,
+            f'db;dur={counter.duration * 1000:.1f};'
+            f'desc="{counter.count} queries"',
+            f'app;dur={total * 1000:.1f}',
+        )
+        self.check_budget(request, counter.count)
+        return response
+
+    def check_budget(self, request, count):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return
+        budget = get_budget(match.view_name)
+        if budget is None or count <= budget:
+            return
+        message = (
+            f'{match.view_name} ({request.path}): {count} запросов '
+            f'к базе при бюджете {budget}'
+        )
+        if getattr(settings, 'QUERY_BUDGET_RAISE', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ReplicaMiddleware:
+    """Отправляет чтение read-only страниц в реплики базы.
+
+    Страницы из REPLICA_VIEWS читают из реплики, если запрос безопасный
+    (GET/HEAD) и у пользователя нет cookie REPLICA_PIN_COOKIE. Cookie
+    ставится после каждого изменяющего запроса на REPLICA_PIN_SECONDS:
+    пока реплика догоняет основную базу, пользователь читает из
+    основной и видит свои изменения.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.replica_token = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.replica_token is not None:
+                stop_replica_reads(request.replica_token)
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+            and match is not None
+            and match.view_name in settings.REPLICA_VIEWS
+        ):
+            request.replica_token = start_replica_reads()
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(default='default', help_text='Очередь со своим лимитом одновременных задач', max_length=50, verbose_name='Очередь')),
+                ('name', models.CharField(help_text='Имя зарегистрированного обработчика задачи', max_length=100, verbose_name='Обработчик')),
+                ('payload', models.TextField(default='{}', help_text='Именованные аргументы обработчика в JSON', verbose_name='Аргументы')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('done', 'Выполнена'), ('failed', 'Ошибка')], default='queued', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='Максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время, раньше которого задачу не берут (отсрочка повтора)', verbose_name='Выполнить после')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Взята в работу')),
+                ('locked_by', models.CharField(blank=True, db_index=True, help_text='Метка выборки, которой обработчик взял задачу', max_length=32, verbose_name='Метка обработчика')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ['run_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['queue', 'status', 'run_at'], name='job_queue_status_run_at_idx'),
+        ),
+    ]
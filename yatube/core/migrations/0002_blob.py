@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='blobs/<ab>/<sha256>.<ext>', max_length=100, unique=True, verbose_name='Имя файла')),
+                ('size', models.PositiveIntegerField(help_text='Размер файла в байтах', verbose_name='Размер')),
+                ('references', models.PositiveIntegerField(default=1, help_text='Сколько загрузок ссылается на файл', verbose_name='Ссылок')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Файл',
+                'verbose_name_plural': 'Файлы',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,117 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Модель фоновой задачи локальной очереди."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    queue = models.CharField(
+        max_length=50,
+        default='default',
+        verbose_name='Очередь',
+        help_text='Очередь со своим лимитом одновременных задач',
+    )
+    name = models.CharField(
+        max_length=100,
+        verbose_name='Обработчик',
+        help_text='Имя зарегистрированного обработчика задачи',
+    )
+    payload = models.TextField(
+        default='{}',
+        verbose_name='Аргументы',
+        help_text='Именованные аргументы обработчика в JSON',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток',
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        default=3,
+        verbose_name='Максимум попыток',
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить после',
+        help_text='Время, раньше которого задачу не берут (отсрочка повтора)',
+    )
+    locked_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Взята в работу',
+    )
+    locked_by = models.CharField(
+        max_length=32,
+        blank=True,
+        db_index=True,
+        verbose_name='Метка обработчика',
+        help_text='Метка выборки, которой обработчик взял задачу',
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name='Последняя ошибка',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['queue', 'status', 'run_at'],
+                name='job_queue_status_run_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.queue}:{self.name}#{self.pk}'
+
+
+class Blob(models.Model):
+    """Модель файла ContentAddressedStorage и числа ссылок на него."""
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name='Имя файла',
+        help_text='blobs/<ab>/<sha256>.<ext>',
+    )
+    size = models.PositiveIntegerField(
+        verbose_name='Размер',
+        help_text='Размер файла в байтах',
+    )
+    references = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Ссылок',
+        help_text='Сколько загрузок ссылается на файл',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания',
+    )
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Файл'
+        verbose_name_plural = 'Файлы'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,211 @@
+"""Локальная очередь фоновых задач в базе данных.
+
+Обработчики регистрируются декоратором @job в модулях jobs.py
+приложений, задачи ставятся вызовом enqueue() и выполняются командой
+manage.py run_jobs. Очередь поддерживает повторы с экспоненциальной
+отсрочкой, пакетную обработку и лимит одновременных задач на очередь
+(настройка JOB_QUEUES), внешний брокер не нужен. Выполненные задачи
+удаляются через JOB_KEEP_DONE секунд, упавшие остаются для разбора.
+"""
+import json
+import logging
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE: str = 'default'
+DEFAULT_CONCURRENCY: int = 1
+
+_handlers = {}
+
+
+class JobHandler:
+    """Зарегистрированный обработчик задач."""
+
+    def __init__(self, func, name, queue, max_attempts, batch):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, **payload):
+        """Ставит задачу с аргументами payload в очередь."""
+        return enqueue(self.name, payload)
+
+
+def job(name=None, queue=DEFAULT_QUEUE, max_attempts=3, batch=False):
+    """Регистрирует функцию как обработчик фоновых задач.
+
+    Обработчик с batch=True получает список аргументов всех задач,
+    взятых из очереди за один раз, а не вызывается на каждую задачу.
+    """
+    def decorator(func):
+        handler = JobHandler(
+            func,
+            name or f'{func.__module__}.{func.__name__}',
+            queue,
+            max_attempts,
+            batch,
+        )
+        _handlers[handler.name] = handler
+        return handler
+    return decorator
+
+
+def get_handler(name):
+    """Обработчик по имени, модули jobs.py приложений загружаются сами."""
+    if name not in _handlers:
+        autodiscover_modules('jobs')
+    return _handlers[name]
+
+
+def enqueue(name, payload=None, run_at=None):
+    """Ставит задачу в очередь её обработчика."""
+    handler = get_handler(name)
+    payload = payload or {}
+    if getattr(settings, 'JOBS_RUN_EAGERLY', False):
+        _call(handler, [payload])
+        return None
+    return Job.objects.create(
+        queue=handler.queue,
+        name=handler.name,
+        payload=json.dumps(payload),
+        max_attempts=handler.max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def _concurrency(queue):
+    queues = getattr(settings, 'JOB_QUEUES', {})
+    return queues.get(queue, {}).get('concurrency', DEFAULT_CONCURRENCY)
+
+
+def release_stale(queue):
+    """Возвращает в очередь задачи, брошенные упавшим обработчиком."""
+    timeout = getattr(settings, 'JOB_LOCK_TIMEOUT', 600)
+    Job.objects.filter(
+        queue=queue,
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    ).update(status=Job.QUEUED, locked_at=None, locked_by='')
+
+
+def claim(queue, limit):
+    """Берёт в работу до limit готовых задач очереди с учётом лимита."""
+    with transaction.atomic():
+        running = Job.objects.filter(queue=queue, status=Job.RUNNING).count()
+        limit = min(limit, _concurrency(queue) - running)
+        if limit <= 0:
+            return []
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        candidates = list(
+            Job.objects
+            .filter(queue=queue, status=Job.QUEUED, run_at__lte=now)
+            .values_list('id', flat=True)[:limit]
+        )
+        # Условное обновление не даст двум обработчикам взять одну задачу.
+        Job.objects.filter(id__in=candidates, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_at=now,
+            locked_by=token,
+        )
+        return list(Job.objects.filter(locked_by=token))
+
+
+def _call(handler, payloads):
+    if handler.batch:
+        handler(payloads)
+    else:
+        for payload in payloads:
+            handler(**payload)
+
+
+def execute(jobs):
+    """Выполняет взятые задачи, пакетные обработчики — одним вызовом."""
+    by_name = {}
+    for job_obj in jobs:
+        by_name.setdefault(job_obj.name, []).append(job_obj)
+    for name, group in by_name.items():
+        try:
+            handler = get_handler(name)
+        except KeyError:
+            _retry_or_fail(group, f'Обработчик {name} не зарегистрирован')
+            continue
+        chunks = [group] if handler.batch else [[item] for item in group]
+        for chunk in chunks:
+            try:
+                _call(handler, [json.loads(item.payload) for item in chunk])
+            except Exception:
+                logger.exception('Задача %s завершилась ошибкой', name)
+                _retry_or_fail(chunk, traceback.format_exc())
+            else:
+                _finish(chunk)
+
+
+def _finish(jobs):
+    Job.objects.filter(id__in=[job_obj.id for job_obj in jobs]).update(
+        status=Job.DONE,
+        attempts=F('attempts') + 1,
+        locked_at=None,
+        locked_by='',
+    )
+
+
+def _retry_or_fail(jobs, error):
+    delay = getattr(settings, 'JOB_RETRY_DELAY', 30)
+    for job_obj in jobs:
+        job_obj.attempts += 1
+        job_obj.last_error = error
+        job_obj.locked_at = None
+        job_obj.locked_by = ''
+        if job_obj.attempts < job_obj.max_attempts:
+            job_obj.status = Job.QUEUED
+            job_obj.run_at = timezone.now() + timedelta(
+                seconds=delay * 2 ** (job_obj.attempts - 1)
+            )
+        else:
+            job_obj.status = Job.FAILED
+        job_obj.save(update_fields=(
+            'attempts', 'last_error', 'locked_at', 'locked_by', 'status',
+            'run_at',
+        ))
+
+
+def prune_done(queue):
+    """Удаляет выполненные задачи очереди старше JOB_KEEP_DONE секунд."""
+    keep = getattr(settings, 'JOB_KEEP_DONE', 24 * 3600)
+    Job.objects.filter(
+        queue=queue,
+        status=Job.DONE,
+        run_at__lt=timezone.now() - timedelta(seconds=keep),
+    ).delete()
+
+
+def work(queues, batch_size):
+    """Один проход обработчика по очередям, возвращает число задач."""
+    processed = 0
+    for queue in queues:
+        release_stale(queue)
+        jobs = claim(queue, batch_size)
+        execute(jobs)
+        # Таблица растёт только от выполненных задач: чистим после
+        # них, а пустой проход ничего не пишет в базу.
+        if jobs:
+            prune_done(queue)
+        processed += len(jobs)
+    return processed
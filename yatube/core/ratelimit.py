@@ -0,0 +1,146 @@
+"""Ограничение частоты запросов: token bucket в кэше.
+
+У каждого клиента своё «ведро» на каждую область (scope): в нём до
+capacity жетонов, которые восполняются равномерно за period секунд.
+Запрос тратит жетон; если жетонов нет, клиент получает 429 с
+заголовком Retry-After.
+
+Клиент определяется по IP и по пользователю, запрос должен пройти оба
+ведра: смена адреса не обходит лимит пользователя, а пользователи за
+общим IP не делят одно ведро. Пользователь — id из сессии, а не
+request.user: так проверка не читает таблицу пользователей, и все
+входы одного пользователя делят ведро. Сессии хранятся в кэше
+(cached_db), поэтому отклонённый запрос обычно не обращается к базе;
+сессию, которой нет в кэше (например, с поддельной cookie), база
+всё же прочитает. Без сессии — в RateLimitMiddleware, которая стоит до
+SessionMiddleware, и у анонима — вместо пользователя берётся хеш
+cookie сессии.
+
+IP берётся из META[RATE_LIMIT_IP_HEADER]: за прокси это заголовок,
+который прокси выставляет сам, иначе все клиенты делят ведро прокси.
+
+rate_limit — декоратор view с лимитом из RATE_LIMITS, RateLimitMiddleware
+— общий лимит RATE_LIMIT_DEFAULT на все изменяющие запросы.
+"""
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse
+
+RATE_LIMIT_KEY: str = 'ratelimit:{scope}:{client}'
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+DEFAULT_SCOPE: str = 'default'
+
+
+def client_ip(request):
+    """IP клиента из META[RATE_LIMIT_IP_HEADER], по умолчанию REMOTE_ADDR."""
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', 'REMOTE_ADDR')
+    address = request.META.get(header) or request.META.get('REMOTE_ADDR', '')
+    # В X-Forwarded-For последний адрес добавил наш прокси, а начало
+    # списка клиент может прислать сам.
+    return address.split(',')[-1].strip()
+
+
+def client_keys(request):
+    """Идентификаторы клиента: IP и id пользователя из сессии, а без
+    него — хеш cookie сессии, если она есть.
+    """
+    keys = [f'ip:{client_ip(request)}']
+    cookie = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    session = getattr(request, 'session', None)
+    user_id = session.get(SESSION_KEY) if cookie and session else None
+    if user_id is not None:
+        keys.append(f'user:{user_id}')
+    elif cookie:
+        digest = hashlib.sha256(cookie.encode()).hexdigest()
+        keys.append(f'session:{digest}')
+    return keys
+
+
+def take_token(scope, clients, capacity, period):
+    """Тратит жетон из вёдер всех clients. Возвращает 0, если запрос
+    разрешён, иначе — сколько секунд ждать следующего жетона.
+    """
+    keys = [
+        RATE_LIMIT_KEY.format(scope=scope, client=client)
+        for client in clients
+    ]
+    now = time.time()
+    refill = capacity / period
+    stored = cache.get_many(keys)
+    buckets = {}
+    wait = 0.0
+    for key in keys:
+        tokens, updated = stored.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        if tokens < 1:
+            wait = max(wait, (1 - tokens) / refill)
+        buckets[key] = (tokens - 1, now)
+    if wait:
+        return wait
+    # Полное ведро и отсутствующее равнозначны: ключ живёт period секунд.
+    cache.set_many(buckets, math.ceil(period))
+    return 0
+
+
+def too_many_requests(wait):
+    response = HttpResponse(
+        'Слишком много запросов, попробуйте позже.',
+        content_type='text/plain; charset=utf-8',
+        status=429,
+    )
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def check_rate(request, scope, limit):
+    """Ответ 429, если клиент исчерпал лимит (capacity, period), иначе
+    None.
+    """
+    if limit is None:
+        return None
+    capacity, period = limit
+    wait = take_token(scope, client_keys(request), capacity, period)
+    return too_many_requests(wait) if wait else None
+
+
+def rate_limit(scope, methods=WRITE_METHODS):
+    """Ограничивает частоту запросов к view лимитом RATE_LIMITS[scope].
+
+    Декоратор ставится внешним, над login_required: лимит проверяется
+    до обращения к пользователю.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                limit = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+                rejected = check_rate(request, scope, limit)
+                if rejected is not None:
+                    return rejected
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimitMiddleware:
+    """Общий лимит RATE_LIMIT_DEFAULT на изменяющие запросы клиента."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in WRITE_METHODS:
+            rejected = check_rate(
+                request,
+                DEFAULT_SCOPE,
+                getattr(settings, 'RATE_LIMIT_DEFAULT', None),
+            )
+            if rejected is not None:
+                return rejected
+        return self.get_response(request)
@@ -0,0 +1,73 @@
+"""Маршрутизация запросов к базе: запись — в основную, чтение
+read-only страниц — в реплики.
+
+Реплики перечислены в настройке DATABASE_REPLICAS. Чтение уходит в
+реплику, только пока ReplicaMiddleware обрабатывает view из
+REPLICA_VIEWS или внутри use_replica() (флаг в contextvar); всё
+остальное, включая запись, идёт в default. Сессии и пользователи
+всегда читаются из default: отставшая реплика не должна разлогинивать
+пользователя.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY_DATABASE: str = 'default'
+# Приложения, модели которых читаются только из основной базы.
+PRIMARY_APPS = frozenset(('auth', 'sessions'))
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def reading_from_replica():
+    """Читают ли запросы текущего контекста из реплики."""
+    return _use_replica.get() and bool(get_replicas())
+
+
+def start_replica_reads():
+    """Направляет чтение в реплики, возвращает токен для отмены."""
+    return _use_replica.set(True)
+
+
+def stop_replica_reads(token):
+    """Возвращает чтение туда, куда оно шло до start_replica_reads."""
+    _use_replica.reset(token)
+
+
+@contextmanager
+def use_replica():
+    """Направляет чтение внутри блока в реплики."""
+    token = start_replica_reads()
+    try:
+        yield
+    finally:
+        stop_replica_reads(token)
+
+
+class ReplicaRouter:
+    """Чтение из реплики внутри use_replica(), иначе — основная база."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            reading_from_replica()
+            and model._meta.app_label not in PRIMARY_APPS
+        ):
+            return random.choice(get_replicas())
+        return PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, объекты из них совместимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему реплик переносит репликация (или sync_replicas).
+        return db == PRIMARY_DATABASE
@@ -0,0 +1,69 @@
+"""Настройка соединений SQLite: PRAGMA и проверка живых соединений.
+
+apply_pragmas (сигнал connection_created) выполняет PRAGMA из
+настройки SQLITE_PRAGMAS на каждом новом соединении SQLite: журнал WAL
+позволяет читать, пока идёт запись, synchronous=NORMAL в режиме WAL не
+теряет целостность базы, mmap_size и cache_size уменьшают число
+обращений к диску, busy_timeout заставляет писателя подождать, а не
+падать с «database is locked».
+
+С CONN_MAX_AGE соединение переживает запрос. check_connections
+(сигнал request_started) перед запросом проверяет открытые соединения
+баз с CONN_HEALTH_CHECKS запросом SELECT 1 и закрывает сломанные:
+Django откроет новое при первом обращении.
+
+PRAGMA и проверка выполняются на DB-API соединении напрямую, в обход
+execute_wrapper: в счётчики запросов view они не попадают.
+"""
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+
+def get_pragmas():
+    return dict(getattr(settings, 'SQLITE_PRAGMAS', DEFAULT_PRAGMAS))
+
+
+def pragma_statements(pragmas):
+    """SQL для набора PRAGMA в порядке словаря."""
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS на новом соединении SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    for statement in pragma_statements(get_pragmas()):
+        connection.connection.execute(statement)
+
+
+def is_healthy(connection):
+    """Отвечает ли открытое соединение на SELECT 1."""
+    try:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except connection.Database.Error:
+        return False
+    return True
+
+
+def check_connections(**kwargs):
+    """Закрывает постоянные соединения, которые перестали отвечать."""
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        if not connection.settings_dict.get('CONN_HEALTH_CHECKS', False):
+            continue
+        if not is_healthy(connection):
+            connection.close()
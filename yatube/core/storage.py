@@ -0,0 +1,154 @@
+"""Хранилище медиафайлов с адресацией по содержимому.
+
+ContentAddressedStorage считает sha256 загрузки, пока копирует её во
+временный файл, и хранит файл под именем blobs/<ab>/<sha256><.ext>.
+Одинаковые картинки, загруженные многими пользователями, лежат на
+диске один раз, и миниатюры sorl-thumbnail для них тоже строятся один
+раз: имя миниатюры зависит от имени исходного файла.
+
+Число ссылок на файл хранит модель Blob: save() добавляет ссылку,
+delete() снимает одну, файл удаляется вместе с последней ссылкой.
+Файлы со старыми именами (до перехода на хранилище) и картинка по
+умолчанию в Blob не учтены, delete() их не трогает.
+"""
+import hashlib
+import os
+import tempfile
+from collections import Counter
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+from .models import Blob
+
+BLOB_DIRECTORY: str = 'blobs'
+
+
+def _umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# mkstemp создаёт файл с правами 0600. Без FILE_UPLOAD_PERMISSIONS
+# blob получает права, с которыми FileSystemStorage создаёт файлы:
+# 0666 с учётом umask процесса.
+DEFAULT_PERMISSIONS: int = 0o666 & ~_umask()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, в котором имя файла — хеш содержимого."""
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save, совпадения — это дубли.
+        return name
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        return '/'.join((BLOB_DIRECTORY, digest[:2], digest + extension))
+
+    def _save(self, name, content):
+        directory = self.path(BLOB_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        # Временный файл — в том же каталоге, что и blobs: os.replace
+        # переносит его в итоговое имя атомарно.
+        descriptor, temporary = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(descriptor, 'wb') as output:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    output.write(chunk)
+                    size += len(chunk)
+            name = self.blob_name(digest.hexdigest(), name)
+            # Сначала ссылка, потом файл: параллельный delete() последней
+            # ссылки не удалит файл, который мы только что учли.
+            self.add_reference(name, size)
+            path = self.path(name)
+            if os.path.exists(path):
+                return name
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            permissions = self.file_permissions_mode
+            if permissions is None:
+                permissions = DEFAULT_PERMISSIONS
+            os.chmod(temporary, permissions)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return name
+
+    def add_reference(self, name, size):
+        updated = Blob.objects.filter(name=name).update(
+            references=F('references') + 1
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                Blob.objects.create(name=name, size=size)
+        except IntegrityError:
+            Blob.objects.filter(name=name).update(
+                references=F('references') + 1
+            )
+
+    def add_references(self, names):
+        """Добавляет по ссылке на каждое вхождение имени в names.
+
+        Возвращает имена, которые можно записать в поле: учтённые в
+        Blob файлы и файлы со старыми именами вне blobs. Имена blobs без
+        записи в Blob (файла в этом хранилище нет) не возвращаются.
+        """
+        kept = set()
+        for name, count in Counter(names).items():
+            if not name.startswith(BLOB_DIRECTORY + '/'):
+                kept.add(name)
+            elif Blob.objects.filter(name=name).update(
+                references=F('references') + count
+            ):
+                kept.add(name)
+        return kept
+
+    def delete(self, name):
+        """Снимает ссылку на файл и удаляет его вместе с последней."""
+        with transaction.atomic():
+            blob = (
+                Blob.objects
+                .select_for_update()
+                .filter(name=name)
+                .first()
+            )
+            if blob is None:
+                return
+            if blob.references > 1:
+                Blob.objects.filter(pk=blob.pk).update(
+                    references=F('references') - 1
+                )
+                return
+            blob.delete()
+            super().delete(name)
+
+
+def retain(storage, names):
+    """Добавляет ссылки на уже сохранённые файлы, если они в
+    ContentAddressedStorage, и возвращает имена, которые можно записать.
+
+    Нужна записям, которые получают имя файла в обход save() поля,
+    например при загрузке выгрузки.
+    """
+    if isinstance(storage, ContentAddressedStorage):
+        return storage.add_references(names)
+    return set(names)
+
+
+def release(storage, name):
+    """Снимает ссылку на файл, если он в ContentAddressedStorage.
+
+    Вызывается сигналами после удаления объекта или замены файла.
+    """
+    if name and isinstance(storage, ContentAddressedStorage):
+        storage.delete(name)
@@ -1,3 +1,5 @@
+from urllib.parse import urlencode
+
 from django import template
 
 register = template.Library()
@@ -11,3 +13,20 @@ def addclass(field, css):
     }
 
     return field.as_widget(attrs=context)
+
+
+@register.filter
+def get_item(mapping, key):
+    """Значение словаря по ключу, None если словаря или ключа нет."""
+    if not mapping:
+        return None
+    return mapping.get(key)
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Ссылка на страницу списка с сохранением поискового запроса."""
+    if context.get('query'):
+        params['q'] = context['query']
+    params = {key: value for key, value in params.items() if value}
+    return f'?{urlencode(params)}'
@@ -0,0 +1,102 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..metrics import get_buckets, registry, remove_stale_files
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings_override = override_settings(
+            METRICS_DIR=self.directory.name
+        )
+        self.settings_override.enable()
+        registry.reset()
+        cache.clear()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.directory.cleanup()
+        registry.reset()
+
+    def get_metrics(self):
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def sample(self, text, name, view):
+        match = re.search(
+            rf'^yatube_{name}{{view="{re.escape(view)}"}} (\S+)$',
+            text,
+            re.MULTILINE,
+        )
+        self.assertIsNotNone(match, f'{name} для {view}')
+        return float(match.group(1))
+
+    def test_view_metrics(self):
+        """Метрики считают запросы, время базы и шаблонов по view."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        text = self.get_metrics()
+        self.assertEqual(self.sample(text, 'requests_total', 'posts:index'), 2)
+        self.assertGreater(
+            self.sample(text, 'db_queries_total', 'posts:index'), 0
+        )
+        self.assertGreater(
+            self.sample(text, 'template_duration_seconds_total',
+                        'posts:index'),
+            0,
+        )
+        self.assertIn(
+            'yatube_request_duration_seconds_bucket'
+            '{view="posts:index",le="+Inf"} 2',
+            text,
+        )
+
+    def test_processes_are_summed(self):
+        """Метрики других процессов из METRICS_DIR складываются."""
+        self.client.get(reverse('posts:index'))
+        other = {
+            'count': 3, 'errors': 1, 'duration': 0.3,
+            'buckets': [3] + [0] * (len(get_buckets()) - 1),
+            'db_duration': 0.1, 'db_queries': 6,
+            'template_duration': 0.1,
+        }
+        path = os.path.join(self.directory.name, 'metrics-1.json')
+        with open(path, 'w') as output:
+            json.dump({
+                'buckets': get_buckets(),
+                'views': {'posts:index': other},
+            }, output)
+        text = self.get_metrics()
+        self.assertEqual(self.sample(text, 'requests_total', 'posts:index'), 4)
+        self.assertEqual(
+            self.sample(text, 'request_errors_total', 'posts:index'), 1
+        )
+
+    @skipUnless(os.name == 'posix', 'Проверка процессов только в POSIX')
+    def test_stale_files_removed(self):
+        """Файлы завершившихся процессов удаляются, живых — остаются."""
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        names = (f'metrics-{process.pid}.json', f'metrics-{os.getpid()}.json')
+        for name in names:
+            with open(os.path.join(self.directory.name, name), 'w') as output:
+                output.write('{}')
+        remove_stale_files()
+        self.assertEqual(os.listdir(self.directory.name), [names[1]])
+
+    def test_metrics_only_for_internal_ips(self):
+        """Страница метрик недоступна с внешних адресов."""
+        client = Client(REMOTE_ADDR='192.0.2.1')
+        response = client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,31 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..middleware import QueryBudgetExceeded
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def test_server_timing(self):
+        """Ответ содержит время и число запросов к базе."""
+        response = self.client.get(reverse('posts:api_index'))
+        timing = response['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="1 queries"', timing)
+        self.assertIn('app;dur=', timing)
+
+    @override_settings(QUERY_BUDGETS={'posts:api_index': 0})
+    def test_budget_exceeded_is_logged(self):
+        """Превышение бюджета пишется в лог."""
+        with self.assertLogs('core.middleware', 'WARNING') as logs:
+            response = self.client.get(reverse('posts:api_index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('posts:api_index', logs.output[0])
+
+    @override_settings(
+        QUERY_BUDGETS={'posts:api_index': 0},
+        QUERY_BUDGET_RAISE=True,
+    )
+    def test_budget_exceeded_raises(self):
+        """С QUERY_BUDGET_RAISE превышение бюджета — ошибка."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('posts:api_index'))
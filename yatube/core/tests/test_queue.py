@@ -0,0 +1,133 @@
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from ..management.commands.run_jobs import Command
+from ..models import Job
+from ..queue import claim, enqueue, job, work
+
+calls = []
+
+
+@job(name='tests.record', queue='tests')
+def record(value):
+    calls.append(value)
+
+
+@job(name='tests.record_batch', queue='tests', batch=True)
+def record_batch(payloads):
+    calls.append([payload['value'] for payload in payloads])
+
+
+@job(name='tests.fail', queue='tests', max_attempts=2)
+def fail():
+    raise RuntimeError('Ошибка задачи')
+
+
+@override_settings(
+    JOB_QUEUES={'tests': {'concurrency': 2}},
+    JOB_RETRY_DELAY=0,
+)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_in_worker(self):
+        """Задача выполняется обработчиком, а не при постановке."""
+        record.delay(value=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(work(['tests'], batch_size=10), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def test_concurrency_limit(self):
+        """Из очереди нельзя взять больше задач, чем её лимит."""
+        for value in range(3):
+            enqueue('tests.record', {'value': value})
+        self.assertEqual(len(claim('tests', 10)), 2)
+        self.assertEqual(claim('tests', 10), [])
+
+    def test_batch_handler(self):
+        """Пакетный обработчик получает задачи одним вызовом."""
+        record_batch.delay(value=1)
+        record_batch.delay(value=2)
+        work(['tests'], batch_size=10)
+        self.assertEqual(calls, [[1, 2]])
+
+    def test_retry_then_fail(self):
+        """Упавшая задача повторяется и помечается ошибкой после
+        исчерпания попыток.
+        """
+        fail.delay()
+        work(['tests'], batch_size=10)
+        failed_job = Job.objects.get()
+        self.assertEqual(failed_job.status, Job.QUEUED)
+        self.assertEqual(failed_job.attempts, 1)
+        work(['tests'], batch_size=10)
+        failed_job.refresh_from_db()
+        self.assertEqual(failed_job.status, Job.FAILED)
+        self.assertIn('Ошибка задачи', failed_job.last_error)
+
+    @override_settings(JOB_KEEP_DONE=60)
+    def test_done_jobs_pruned(self):
+        """Старые выполненные задачи удаляются, упавшие остаются."""
+        old = timezone.now() - timedelta(seconds=120)
+        enqueue('tests.record', {'value': 1}, run_at=old)
+        Job.objects.create(
+            queue='tests', name='tests.fail', status=Job.FAILED, run_at=old
+        )
+        work(['tests'], batch_size=10)
+        enqueue('tests.record', {'value': 2})
+        work(['tests'], batch_size=10)
+        self.assertEqual(
+            sorted(Job.objects.values_list('status', flat=True)),
+            [Job.DONE, Job.FAILED],
+        )
+
+    def test_worker_survives_locked_database(self):
+        """Обработчик run_jobs повторяет проход после OperationalError."""
+        record.delay(value=1)
+        passes = []
+
+        def locked_once(queues, batch_size):
+            passes.append(queues)
+            if len(passes) == 1:
+                raise OperationalError('database is locked')
+            return work(queues, batch_size)
+
+        stderr = StringIO()
+        command = Command(stdout=StringIO(), stderr=stderr)
+        command.processed = 0
+        command.lock = threading.Lock()
+        options = {'batch_size': 10, 'once': True, 'sleep': 0}
+        # loop() в потоке теста: иначе задача не видна из транзакции.
+        with mock.patch(
+            'core.management.commands.run_jobs.work', locked_once
+        ), mock.patch.object(connection, 'close'):
+            command.loop(['tests'], options)
+        self.assertIn('database is locked', stderr.getvalue())
+        self.assertEqual(calls, [1])
+        self.assertEqual(command.processed, 1)
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        JOB_QUEUES={'mail': {'concurrency': 10}},
+    )
+    def test_password_reset_mail_is_queued(self):
+        """Письмо сброса пароля уходит через очередь задач."""
+        from django.contrib.auth import get_user_model
+        get_user_model().objects.create_user(
+            username='username', email='user@example.com', password='pass',
+        )
+        self.client.post('/auth/password_reset/',
+                         {'email': 'user@example.com'})
+        self.assertEqual(len(mail.outbox), 0)
+        work(['mail'], batch_size=10)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
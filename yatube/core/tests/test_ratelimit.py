@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+from ..ratelimit import take_token
+
+
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch('core.ratelimit.time.time')
+    def test_bucket_refills(self, now):
+        """Ведро выдаёт capacity жетонов и восполняется за period."""
+        now.return_value = 1000.0
+        self.assertEqual(take_token('tests', ['ip:1'], 2, 60), 0)
+        self.assertEqual(take_token('tests', ['ip:1'], 2, 60), 0)
+        self.assertEqual(take_token('tests', ['ip:1'], 2, 60), 30)
+        self.assertEqual(take_token('tests', ['ip:2'], 2, 60), 0)
+        now.return_value = 1030.0
+        self.assertEqual(take_token('tests', ['ip:1'], 2, 60), 0)
+
+    def test_all_buckets_required(self):
+        """Запрос проходит, только если жетон есть во всех вёдрах."""
+        take_token('tests', ['ip:1'], 1, 60)
+        self.assertTrue(take_token('tests', ['ip:1', 'session:a'], 1, 60))
+        self.assertEqual(take_token('tests', ['session:a'], 1, 60), 0)
+
+
+@override_settings(RATE_LIMITS={'posts:add_comment': (1, 60)})
+class RateLimitViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.other = User.objects.create(
+            username='other',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:add_comment', args=(self.post.id,))
+
+    def test_rejected_without_database(self):
+        """Сверх лимита — 429 с Retry-After и без запросов к базе."""
+        self.authorized_client.post(self.url, {'text': 'Первый'})
+        with self.assertNumQueries(0):
+            response = self.authorized_client.post(
+                self.url, {'text': 'Второй'}
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_other_ip_and_user(self):
+        """Другой пользователь с другого IP не ограничен."""
+        self.authorized_client.post(self.url, {'text': 'Первый'})
+        client = Client(REMOTE_ADDR='10.0.0.2')
+        client.force_login(self.other)
+        response = client.post(self.url, {'text': 'Второй'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_user_bucket_shared_by_sessions(self):
+        """Новый вход того же пользователя с другого IP не обходит
+        лимит.
+        """
+        self.authorized_client.post(self.url, {'text': 'Первый'})
+        client = Client(REMOTE_ADDR='10.0.0.2')
+        client.force_login(self.user)
+        response = client.post(self.url, {'text': 'Второй'})
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(
+        RATE_LIMIT_DEFAULT=(1, 60),
+        RATE_LIMIT_IP_HEADER='HTTP_X_FORWARDED_FOR',
+    )
+    def test_ip_header(self):
+        """За прокси клиент определяется по заголовку из настройки."""
+        url = reverse('users:login')
+        first = Client(HTTP_X_FORWARDED_FOR='10.0.0.9, 198.51.100.1')
+        second = Client(HTTP_X_FORWARDED_FOR='198.51.100.2')
+        self.assertNotEqual(first.post(url).status_code, 429)
+        self.assertNotEqual(second.post(url).status_code, 429)
+        spoofed = Client(HTTP_X_FORWARDED_FOR='10.0.0.3, 198.51.100.1')
+        self.assertEqual(spoofed.post(url).status_code, 429)
+
+    @override_settings(RATE_LIMIT_DEFAULT=(1, 60))
+    def test_default_limit(self):
+        """Общий лимит действует на все изменяющие запросы."""
+        self.client.post(reverse('users:login'))
+        response = self.client.post(reverse('users:login'))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(self.client.get(reverse('posts:index')).status_code,
+                         200)
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from ..routers import ReplicaRouter, use_replica
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTests(TestCase):
+    def test_routing(self):
+        """Чтение уходит в реплику только внутри use_replica()."""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Post), 'default')
+        with use_replica():
+            self.assertEqual(router.db_for_read(Post), REPLICA)
+            self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Post), 'default')
+
+    def test_sessions_and_users_from_primary(self):
+        """Сессии и пользователи всегда читаются из основной базы."""
+        router = ReplicaRouter()
+        with use_replica():
+            for model in (Session, User):
+                with self.subTest(model=model):
+                    self.assertEqual(router.db_for_read(model), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Без реплик всё читается из основной базы."""
+        with use_replica():
+            self.assertEqual(ReplicaRouter().db_for_read(Post), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaMiddlewareTests(TransactionTestCase):
+    """Проверка на двух файлах SQLite: основной базе и реплике."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.directory.name, 'replica.sqlite3'),
+        }
+        self.user = User.objects.create_user(username='username')
+        self.post = Post.objects.create(
+            text='Текст в реплике',
+            author=self.user,
+        )
+        call_command('sync_replicas', stdout=StringIO())
+        Post.objects.filter(pk=self.post.pk).update(
+            text='Текст в основной базе'
+        )
+        self.url = reverse('posts:post_detail', args=(self.post.id,))
+
+    def tearDown(self):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+        self.directory.cleanup()
+
+    def test_read_only_view_reads_replica(self):
+        """Страница поста читает из реплики."""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Текст в реплике')
+
+    def test_other_views_read_primary(self):
+        """Остальные страницы читают из основной базы."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('posts:post_edit', args=(self.post.id,))
+        )
+        self.assertContains(response, 'Текст в основной базе')
+
+    def test_read_your_writes(self):
+        """После POST пользователь читает из основной базы."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.post(
+            reverse('posts:add_comment', args=(self.post.id,)),
+            {'text': 'Комментарий'},
+        )
+        self.assertIn('use_primary', response.cookies)
+        response = client.get(self.url)
+        self.assertContains(response, 'Текст в основной базе')
+        self.assertContains(response, 'Комментарий')
@@ -0,0 +1,76 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+
+from ..sqlite import check_connections
+
+ALIAS = 'tuned'
+
+
+class SQLiteConnectionTests(TestCase):
+    """Проверка на отдельном файле SQLite."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        connections.databases[ALIAS] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(self.directory.name, 'tuned.sqlite3'),
+            'CONN_MAX_AGE': 60,
+            'CONN_HEALTH_CHECKS': True,
+        }
+        self.connection = connections[ALIAS]
+
+    def tearDown(self):
+        self.connection.close()
+        del connections[ALIAS]
+        del connections.databases[ALIAS]
+        self.directory.cleanup()
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={
+        'journal_mode': 'wal',
+        'synchronous': 'normal',
+        'busy_timeout': 1234,
+    })
+    def test_pragmas_applied(self):
+        """Новое соединение получает PRAGMA из SQLITE_PRAGMAS."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+
+    def test_healthy_connection_kept(self):
+        """Живое соединение переживает проверку перед запросом."""
+        self.connection.ensure_connection()
+        raw = self.connection.connection
+        check_connections()
+        self.assertIs(self.connection.connection, raw)
+
+    def test_broken_connection_closed(self):
+        """Неотвечающее соединение закрывается перед запросом."""
+        self.connection.ensure_connection()
+        self.connection.connection.close()
+        check_connections()
+        self.assertIsNone(self.connection.connection)
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+
+
+class BenchmarkSQLiteCommandTests(TestCase):
+    def test_benchmark(self):
+        """Бенчмарк сравнивает оба профиля и сохраняет JSON."""
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            with mock.patch('time.sleep'):
+                call_command(
+                    'benchmark_sqlite', duration=0.01, rows=10, readers=1,
+                    writers=1, output=output.name, stdout=StringIO(),
+                )
+            with open(output.name) as source:
+                self.assertIn('"tuned"', source.read())
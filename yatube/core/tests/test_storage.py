@@ -0,0 +1,146 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from posts.export import export_lines
+from posts.importer import PostImporter, parse_line
+from posts.models import Post, User
+
+from ..models import Blob
+from ..storage import DEFAULT_PERMISSIONS, ContentAddressedStorage
+
+IMAGE = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.storage = ContentAddressedStorage(location=self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_duplicates_stored_once(self):
+        """Одинаковое содержимое хранится одним файлом с двумя ссылками."""
+        first = self.storage.save('posts/a.GIF', ContentFile(IMAGE))
+        second = self.storage.save('posts/avatar/b.gif', ContentFile(IMAGE))
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith('blobs/'))
+        self.assertTrue(first.endswith('.gif'))
+        self.assertEqual(Blob.objects.get(name=first).references, 2)
+        blobs = os.listdir(os.path.dirname(self.storage.path(first)))
+        self.assertEqual(blobs, [os.path.basename(first)])
+
+    def test_last_reference_deletes_file(self):
+        """Файл удаляется вместе с последней ссылкой."""
+        name = self.storage.save('a.gif', ContentFile(IMAGE))
+        self.storage.save('b.gif', ContentFile(IMAGE))
+        self.storage.delete(name)
+        self.assertTrue(self.storage.exists(name))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    @override_settings(FILE_UPLOAD_PERMISSIONS=None)
+    def test_default_permissions(self):
+        """Без FILE_UPLOAD_PERMISSIONS blob получает права 0666 с учётом
+        umask, как файлы FileSystemStorage, а не 0600 временного файла.
+        """
+        storage = ContentAddressedStorage(location=self.directory)
+        name = storage.save('a.gif', ContentFile(IMAGE))
+        mode = os.stat(storage.path(name)).st_mode & 0o777
+        self.assertEqual(mode, DEFAULT_PERMISSIONS)
+
+    def test_untracked_file_kept(self):
+        """Файлы, не учтённые в Blob, delete() не трогает."""
+        path = os.path.join(self.directory, 'default_avatar.png')
+        with open(path, 'wb') as output:
+            output.write(IMAGE)
+        self.storage.delete('default_avatar.png')
+        self.assertTrue(os.path.exists(path))
+
+
+class PostImageReferenceTests(TransactionTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.override = override_settings(MEDIA_ROOT=self.directory)
+        self.override.enable()
+        self.user = User.objects.create_user(username='username')
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def create_post(self, name):
+        return Post.objects.create(
+            text='Пост с картинкой',
+            author=self.user,
+            image=SimpleUploadedFile(name, IMAGE, content_type='image/gif'),
+        )
+
+    def test_posts_share_image(self):
+        """Посты с одной картинкой делят файл до удаления последнего."""
+        first = self.create_post('first.gif')
+        second = self.create_post('second.gif')
+        self.assertEqual(first.image.name, second.image.name)
+        name = first.image.name
+        first.delete()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, name)))
+        second.image = ''
+        second.save()
+        self.assertFalse(os.path.exists(os.path.join(self.directory, name)))
+
+    def test_same_image_uploaded_again(self):
+        """Повторная загрузка той же картинки не копит ссылки."""
+        post = self.create_post('first.gif')
+        post.image = SimpleUploadedFile(
+            'again.gif', IMAGE, content_type='image/gif'
+        )
+        post.save()
+        self.assertEqual(Blob.objects.get(name=post.image.name).references, 1)
+
+    def import_records(self, records, exclude=()):
+        importer = PostImporter(source='dump')
+        for record in records:
+            importer.add(record)
+        importer.finish()
+        return Post.objects.exclude(pk__in=exclude).get()
+
+    def test_imported_post_shares_image(self):
+        """Загруженный из выгрузки пост добавляет ссылку на картинку."""
+        post = self.create_post('first.gif')
+        name = post.image.name
+        imported = self.import_records(
+            map(parse_line, export_lines(self.user)), exclude=[post.pk]
+        )
+        self.assertEqual(imported.image.name, name)
+        self.assertEqual(Blob.objects.get(name=name).references, 2)
+        imported.delete()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, name)))
+        self.assertEqual(Blob.objects.get(name=name).references, 1)
+
+    def test_imported_missing_image_dropped(self):
+        """Картинка, которой нет в хранилище, не загружается."""
+        imported = self.import_records([{
+            'type': 'post',
+            'id': 1,
+            'author': 'username',
+            'group': None,
+            'text': 'Пост из другой базы',
+            'pub_date': '2015-01-01T10:00:00+00:00',
+            'image': 'blobs/00/' + '0' * 64 + '.gif',
+        }])
+        self.assertFalse(imported.image)
+        self.assertFalse(Blob.objects.exists())
@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from .metrics import collect, render_prometheus
+
 
 def permission_denied(request, exception):
     """Страница ошибки 403 - ограничение в доступе."""
@@ -19,3 +24,13 @@ def page_not_found(request, exception):
 def server_error(request):
     """Страница ошибки 500 - внутренняя ошибка сервера."""
     return render(request, 'core/500.html', status=500)
+
+
+def metrics(request):
+    """Метрики view в формате Prometheus, доступны только INTERNAL_IPS."""
+    if request.META.get('REMOTE_ADDR') not in settings.INTERNAL_IPS:
+        raise PermissionDenied
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
 from .models import Comment, Follow, Group, Post, Profile, User
+from .search import matching_ids, search_available
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -17,6 +18,14 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту через полнотекстовый индекс вместо LIKE."""
+        if not search_term or not search_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return queryset.filter(pk__in=matching_ids(search_term)), False
+
 
 class CommentAdmin(admin.ModelAdmin):
     """Поля модели Comment доступные в admin"""
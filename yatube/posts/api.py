@@ -0,0 +1,138 @@
+"""Read-only JSON API лент для мобильного клиента.
+
+Ответы содержат компактные записи постов и курсоры keyset-пагинации.
+ETag и Last-Modified вычисляются из версии ленты в кэше (caching.py),
+поэтому повторный запрос неизменившейся ленты получает 304 без
+обращения к базе и сериализации.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import condition, require_safe
+
+from .caching import (INDEX_FEED, comments_feed, get_feed_version,
+                      group_feed, post_feed, profile_feed)
+from .models import Group, Post, User
+from .pagination import KeysetPaginator
+
+POSTS_ON_PAGE: int = 10
+COMMENTS_ON_PAGE: int = 50
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'image', 'comments_count',
+    'author__username', 'group__slug',
+)
+COMMENT_FIELDS = ('id', 'text', 'created', 'post_id', 'author__username')
+JSON_PARAMS = {'ensure_ascii': False, 'separators': (',', ':')}
+
+
+def feed_condition(feed_name, with_comments=False):
+    """Условный GET по версии ленты: strong ETag и Last-Modified.
+
+    feed_name получает именованные аргументы view и возвращает имя
+    ленты. ETag учитывает курсор, так как от него зависит ответ. С
+    with_comments учитывается и версия счётчиков комментариев ленты.
+    """
+    def versions(**kwargs):
+        feed = feed_name(**kwargs)
+        feeds = [feed]
+        if with_comments:
+            feeds.append(comments_feed(feed))
+        return feed, [get_feed_version(name) for name in feeds]
+
+    def etag(request, **kwargs):
+        feed, feed_versions = versions(**kwargs)
+        raw = '{}:{}:{}'.format(
+            feed,
+            ':'.join(map(str, feed_versions)),
+            request.GET.get('cursor', ''),
+        )
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, **kwargs):
+        version = max(versions(**kwargs)[1])
+        return datetime.fromtimestamp(version / 10 ** 9, tz=timezone.utc)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def post_record(post):
+    """Компактное представление поста."""
+    return {
+        'id': post.id,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': post.author.username,
+        'group': post.group.slug if post.group_id else None,
+        'image': post.image.url if post.image else None,
+        'comments_count': post.comments_count,
+    }
+
+
+def feed_response(request, posts):
+    """Страница ленты в JSON с курсорами соседних страниц."""
+    posts = posts.select_related('author', 'group').only(*POST_FIELDS)
+    page = KeysetPaginator(posts, POSTS_ON_PAGE).get_page(
+        request.GET.get('cursor')
+    )
+    data = {
+        'results': [post_record(post) for post in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
+    return JsonResponse(data, json_dumps_params=JSON_PARAMS)
+
+
+@require_safe
+@feed_condition(lambda: INDEX_FEED, with_comments=True)
+def index(request):
+    """Лента главной страницы."""
+    return feed_response(request, Post.objects.all())
+
+
+@require_safe
+@feed_condition(group_feed, with_comments=True)
+def group_list(request, slug):
+    """Лента группы."""
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, group.posts.all())
+
+
+@require_safe
+@feed_condition(profile_feed, with_comments=True)
+def profile(request, username):
+    """Лента автора."""
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, author.posts.all())
+
+
+@require_safe
+@feed_condition(post_feed)
+def post_detail(request, post_id):
+    """Пост со страницей комментариев в порядке добавления."""
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group').only(*POST_FIELDS),
+        id=post_id,
+    )
+    comments = (
+        post.comments
+        .select_related('author')
+        .only(*COMMENT_FIELDS)
+    )
+    page = KeysetPaginator(
+        comments, COMMENTS_ON_PAGE, field='created', descending=False
+    ).get_page(request.GET.get('cursor'))
+    data = post_record(post)
+    data['comments'] = [
+        {
+            'id': comment.id,
+            'author': comment.author.username,
+            'text': comment.text,
+            'created': comment.created.isoformat(),
+        }
+        for comment in page
+    ]
+    data['next'] = page.next_cursor
+    data['previous'] = page.previous_cursor
+    return JsonResponse(data, json_dumps_params=JSON_PARAMS)
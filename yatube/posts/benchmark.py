@@ -0,0 +1,319 @@
+"""Нагрузочный бенчмарк страниц posts на синтетических данных.
+
+seed() наполняет базу пользователями, группами, постами, комментариями
+и подписками. Число подписчиков и постов у автора распределено по
+степенному закону (Парето), как в настоящих соцсетях: у немногих
+авторов огромные аудитории, у большинства — единицы.
+
+run() открывает через тестовый клиент адреса BENCHMARK_ROUTES и
+собирает p50/p95 времени ответа и число запросов к базе. В список
+входят только маршруты, которые по GET ничего не меняют; каждый
+открывается пользователем, которому он отвечает 200.
+"""
+import math
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+
+from . import timeline, urls
+from .counters import recount_counters
+from .importer import bulk_insert
+from .models import (Comment, Follow, Group, Post, Profile, User,
+                     make_excerpt)
+
+BENCHMARK_PREFIX: str = 'bench_'
+BENCHMARK_PASSWORD: str = 'benchmark'
+SEED_BATCH_SIZE: int = 1000
+# Кто открывает маршрут: PUBLIC — читатель или аноним (--anonymous),
+# READER — только вошедший читатель, AUTHOR — автор поста.
+PUBLIC: str = 'public'
+READER: str = 'reader'
+AUTHOR: str = 'author'
+# Маршруты только для чтения. Подписка, отписка и комментарий меняют
+# данные, поэтому в замеры не входят.
+BENCHMARK_ROUTES = {
+    'index': PUBLIC,
+    'group_list': PUBLIC,
+    'profile': PUBLIC,
+    'post_detail': PUBLIC,
+    'post_comments': PUBLIC,
+    'search': PUBLIC,
+    'post_create': READER,
+    'post_edit': AUTHOR,
+    'follow_index': READER,
+    'profile_settings': READER,
+    'profile_export': AUTHOR,
+    'group_create': READER,
+    'feed_index_rss': PUBLIC,
+    'feed_index_atom': PUBLIC,
+    'feed_group_rss': PUBLIC,
+    'feed_group_atom': PUBLIC,
+    'feed_profile_rss': PUBLIC,
+    'feed_profile_atom': PUBLIC,
+    'api_index': PUBLIC,
+    'api_group_list': PUBLIC,
+    'api_profile': PUBLIC,
+    'api_post_detail': PUBLIC,
+}
+# Параметры запросов для адресов, которым мало одних аргументов пути.
+URL_QUERIES = {
+    'search': {'q': 'пост'},
+}
+
+
+class BenchmarkError(Exception):
+    """Адрес бенчмарка ответил не 200: замер был бы неверным."""
+
+
+def _pareto_weights(rng, count, alpha):
+    return [rng.paretovariate(alpha) for _ in range(count)]
+
+
+def seed(users=1000, groups=20, posts=20000, comments=20000,
+         alpha=1.2, random_seed=0):
+    """Создаёт синтетический набор данных, возвращает число строк."""
+    rng = random.Random(random_seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(random_seed)
+    password = make_password(BENCHMARK_PASSWORD)
+    now = timezone.now()
+
+    with transaction.atomic():
+        first = User.objects.count()
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f'{BENCHMARK_PREFIX}{first + i}',
+                    password=password,
+                )
+                for i in range(users)
+            ],
+            SEED_BATCH_SIZE,
+        )
+        user_ids = list(
+            User.objects
+            .filter(username__startswith=BENCHMARK_PREFIX)
+            .values_list('id', flat=True)
+        )
+        # bulk_create не вызывает сигнал, создающий профиль.
+        Profile.objects.bulk_create(
+            [Profile(user_id=user_id) for user_id in user_ids],
+            SEED_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        first = Group.objects.count()
+        Group.objects.bulk_create([
+            Group(
+                title=f'Группа {first + i}',
+                slug=f'{BENCHMARK_PREFIX}{first + i}',
+                description=fake.sentence(),
+            )
+            for i in range(groups)
+        ])
+        group_ids = list(Group.objects.values_list('id', flat=True))
+
+        authors = rng.choices(
+            user_ids,
+            weights=_pareto_weights(rng, len(user_ids), alpha),
+            k=posts,
+        )
+        sentences = [fake.sentence(nb_words=12) for _ in range(500)]
+
+        def new_post(author_id):
+            post = Post(
+                author_id=author_id,
+                group_id=(
+                    rng.choice(group_ids)
+                    if group_ids and rng.random() < 0.7 else None
+                ),
+                text=' '.join(rng.sample(sentences, 3)),
+                pub_date=now - timedelta(
+                    seconds=rng.randrange(365 * 24 * 3600)
+                ),
+            )
+            # bulk_create не вызывает save(), где заполняется анонс.
+            post.excerpt = make_excerpt(post.text)
+            return post
+
+        # bulk_insert, а не bulk_create: сохраняет даты вместо
+        # auto_now_add.
+        bulk_insert(
+            [new_post(author_id) for author_id in authors],
+            SEED_BATCH_SIZE,
+            'pub_date',
+        )
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        bulk_insert(
+            [
+                Comment(
+                    post_id=rng.choice(post_ids),
+                    author_id=rng.choice(user_ids),
+                    text=rng.choice(sentences),
+                    created=now - timedelta(
+                        seconds=rng.randrange(365 * 24 * 3600)
+                    ),
+                )
+                for _ in range(comments if post_ids else 0)
+            ],
+            SEED_BATCH_SIZE,
+            'created',
+        )
+
+        follows = []
+        for author_id in user_ids:
+            audience = min(
+                len(user_ids) - 1,
+                int(rng.paretovariate(alpha)) - 1,
+            )
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id in rng.sample(user_ids, audience + 1)
+                if user_id != author_id
+            )
+        Follow.objects.bulk_create(
+            follows, SEED_BATCH_SIZE, ignore_conflicts=True
+        )
+        recount_counters()
+    timeline.rebuild_timeline()
+    cache.clear()
+    return {
+        'users': len(user_ids),
+        'groups': len(group_ids),
+        'posts': posts,
+        'comments': comments,
+        'follows': len(follows),
+    }
+
+
+def percentile(values, fraction):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def sample_arguments():
+    """Пользователи и значения аргументов адресов: самые «тяжёлые»
+    объекты базы.
+
+    Возвращает словарь пользователей по ролям и аргументы путей по
+    ролям: настройки открывает сам читатель, а редактирование и
+    выгрузку — автор своего поста.
+    """
+    bench_users = User.objects.filter(username__startswith=BENCHMARK_PREFIX)
+    popular = (
+        bench_users.order_by('-settings__followers_count').first()
+        or User.objects.first()
+    )
+    author = (
+        bench_users.order_by('-settings__posts_count').first() or popular
+    )
+    reader = (
+        bench_users.order_by('-settings__following_count').first()
+        or popular
+    )
+    group = Group.objects.order_by('-posts_count').first()
+    post = Post.objects.order_by('-comments_count', '-id').first()
+    own_post = Post.objects.filter(author=author).first()
+    arguments = {
+        'username': popular.username if popular else '',
+        'slug': group.slug if group else '',
+        'post_id': post.id if post else 0,
+    }
+    return {READER: reader, AUTHOR: author}, {
+        PUBLIC: arguments,
+        READER: {
+            **arguments,
+            'username': reader.username if reader else '',
+        },
+        AUTHOR: {
+            **arguments,
+            'username': author.username if author else '',
+            'post_id': own_post.id if own_post else 0,
+        },
+    }
+
+
+def benchmark_urls(arguments):
+    """Тройки (имя, роль, адрес) для маршрутов BENCHMARK_ROUTES."""
+    patterns = {pattern.name: pattern for pattern in urls.urlpatterns}
+    for name, role in BENCHMARK_ROUTES.items():
+        kwargs = {
+            argument: arguments[role][argument]
+            for argument in patterns[name].pattern.converters
+        }
+        yield name, role, reverse(f'{urls.app_name}:{name}', kwargs=kwargs)
+
+
+def measure(client, url, query, repeat, cold):
+    """Время ответов в миллисекундах и число запросов к базе."""
+    timings = []
+    queries = []
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url, query)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        if response.status_code != 200:
+            raise BenchmarkError(f'{url}: ответ {response.status_code}')
+    return {
+        'url': url,
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 0.5), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': max(queries),
+    }
+
+
+def run(repeat=20, anonymous=False, cold=False, warmup=1):
+    """Прогоняет адреса BENCHMARK_ROUTES и возвращает результаты.
+
+    С anonymous=True открываются только маршруты PUBLIC, без входа.
+    """
+    users, arguments = sample_arguments()
+    clients = {PUBLIC: Client(), READER: Client(), AUTHOR: Client()}
+    if not anonymous:
+        clients[PUBLIC].force_login(users[READER])
+        clients[READER].force_login(users[READER])
+        clients[AUTHOR].force_login(users[AUTHOR])
+    results = {}
+    for name, role, url in benchmark_urls(arguments):
+        if anonymous and role != PUBLIC:
+            continue
+        client = clients[role]
+        query = URL_QUERIES.get(name, {})
+        if warmup:
+            measure(client, url, query, warmup, cold)
+        results[name] = measure(client, url, query, repeat, cold)
+    return {
+        'meta': {
+            'date': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'repeat': repeat,
+            'anonymous': anonymous,
+            'cold': cold,
+            'user': None if anonymous else users[READER].username,
+            'author': None if anonymous else users[AUTHOR].username,
+            'posts': Post.objects.count(),
+            'users': User.objects.count(),
+            'follows': Follow.objects.count(),
+        },
+        'views': results,
+    }
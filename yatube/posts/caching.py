@@ -0,0 +1,100 @@
+"""Кэш отрисованных страниц публичных лент.
+
+У каждой ленты (главная, группа, профиль автора, пост) есть версия в кэше —
+отметка времени последнего изменения. Ключ страницы включает версию,
+поэтому при изменении поста, группы или аватара достаточно обновить
+версию затронутых лент: старые страницы просто перестают находиться
+и вытесняются по таймауту.
+"""
+import time
+from functools import wraps
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+INDEX_FEED: str = 'index'
+FEED_VERSION_KEY: str = 'feed-version:{feed}'
+FEED_PAGE_KEY: str = 'feed-page:{feed}:{version}:{page}:{cursor}'
+
+
+def group_feed(slug):
+    """Имя ленты группы."""
+    return f'group:{slug}'
+
+
+def profile_feed(username):
+    """Имя ленты автора."""
+    return f'profile:{username}'
+
+
+def post_feed(post_id):
+    """Имя «ленты» одного поста с комментариями."""
+    return f'post:{post_id}'
+
+
+def comments_feed(feed):
+    """Имя версии счётчиков комментариев в ленте feed.
+
+    Комментарии меняют только её, а не версию самой ленты: кэш HTML и
+    RSS/Atom счётчиков не показывает и остаётся действительным. Версию
+    учитывают ответы API, где счётчик есть в записях постов.
+    """
+    return f'comments:{feed}'
+
+
+def _version_key(feed):
+    return FEED_VERSION_KEY.format(feed=quote(feed))
+
+
+def get_feed_version(feed):
+    """Версия ленты — время её последнего изменения в наносекундах."""
+    key = _version_key(feed)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def touch_feeds(*feeds):
+    """Сбрасывает закэшированные страницы переданных лент."""
+    keys = [_version_key(feed) for feed in set(feeds)]
+    if not keys:
+        return
+    now = time.time_ns()
+    current = cache.get_many(keys)
+    cache.set_many(
+        {key: max(now, current.get(key, 0) + 1) for key in keys},
+        None,
+    )
+
+
+def cache_feed_page(feed_name):
+    """Кэширует страницы ленты для анонимных пользователей.
+
+    feed_name получает именованные аргументы view и возвращает имя
+    ленты, например lambda slug: group_feed(slug).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            feed = feed_name(**kwargs)
+            key = FEED_PAGE_KEY.format(
+                feed=quote(feed),
+                version=get_feed_version(feed),
+                page=quote(request.GET.get('page', '')),
+                cursor=quote(request.GET.get('cursor', '')),
+            )
+            content = cache.get(key)
+            if content is not None:
+                return HttpResponse(content)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.content, settings.FEED_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,40 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарно через F() в обработчиках сигналов, поэтому
+страницам не нужен COUNT(*). Массовые операции в обход сигналов
+(bulk_create, queryset.update) требуют пересчёта: recount_counters.
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Group, Post, Profile
+
+
+def increment(queryset, field, delta=1):
+    """Атомарно меняет счётчик field у объектов queryset на delta."""
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    queryset.update(**{field: F(field) + delta})
+
+
+def _count_of(model, foreign_key, outer_field='pk'):
+    counts = (
+        model.objects
+        .filter(**{foreign_key: OuterRef(outer_field)})
+        .order_by()
+        .values(foreign_key)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def recount_counters():
+    """Пересчитывает все счётчики по фактическим данным."""
+    Profile.objects.update(
+        posts_count=_count_of(Post, 'author_id', 'user_id'),
+        followers_count=_count_of(Follow, 'author_id', 'user_id'),
+        following_count=_count_of(Follow, 'user_id', 'user_id'),
+    )
+    Group.objects.update(posts_count=_count_of(Post, 'group_id'))
+    Post.objects.update(comments_count=_count_of(Comment, 'post_id'))
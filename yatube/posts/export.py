@@ -0,0 +1,71 @@
+"""Потоковая выгрузка постов и комментариев в формате NDJSON.
+
+Каждая строка — отдельный JSON-объект с полем type: group, post или
+comment. Строки читаются из базы порциями через iterator() и сразу
+отдаются потребителю, поэтому память не зависит от объёма истории.
+Этот же формат читает команда import_posts.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Comment, Group, Post
+
+EXPORT_CHUNK_SIZE: int = 2000
+EXPORT_CONTENT_TYPE: str = 'application/x-ndjson'
+
+GROUP_FIELDS = {
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+}
+POST_FIELDS = {
+    'id': 'id',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+
+
+def _records(queryset, record_type, fields, chunk_size):
+    rows = queryset.order_by('pk').values_list(*fields.values())
+    for row in rows.iterator(chunk_size=chunk_size):
+        record = {'type': record_type}
+        record.update(zip(fields, row))
+        yield record
+
+
+def export_records(author=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Записи выгрузки: все данные или только посты и комментарии author.
+
+    Полная выгрузка начинается с групп, чтобы при загрузке они были
+    созданы раньше ссылающихся на них постов.
+    """
+    posts = Post.objects.all()
+    comments = Comment.objects.all()
+    if author is None:
+        yield from _records(
+            Group.objects.all(), 'group', GROUP_FIELDS, chunk_size
+        )
+    else:
+        posts = posts.filter(author=author)
+        comments = comments.filter(author=author)
+    yield from _records(posts, 'post', POST_FIELDS, chunk_size)
+    yield from _records(comments, 'comment', COMMENT_FIELDS, chunk_size)
+
+
+def export_lines(author=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки NDJSON для записи в файл или StreamingHttpResponse."""
+    for record in export_records(author, chunk_size):
+        yield json.dumps(
+            record, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
@@ -0,0 +1,148 @@
+"""RSS- и Atom-ленты главной страницы, групп и авторов.
+
+Лента строится одним запросом по индексу (группа или автор, pub_date)
+из FEED_ITEMS последних постов. Готовый XML хранится в кэше под
+версией ленты (caching.py): он живёт до следующего изменения поста в
+ленте. ETag и Last-Modified тоже берутся из версии, поэтому читатель,
+опрашивающий ленту, получает 304 без обращения к базе.
+"""
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from django.views.decorators.http import require_safe
+
+from .api import feed_condition
+from .caching import INDEX_FEED, get_feed_version, group_feed, profile_feed
+from .models import Group, Post, User
+
+FEED_ITEMS: int = 20
+FEED_FIELDS = (
+    'id', 'text', 'pub_date', 'author__username', 'group__slug',
+    'group__title',
+)
+SYNDICATION_KEY: str = 'syndication:{feed}:{version}:{kind}'
+
+
+class PostsFeed(Feed):
+    """Последние посты главной страницы."""
+    title = 'Yatube: последние записи'
+    description = 'Новые посты всех авторов'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return (
+            self.posts(obj)
+            .select_related('author', 'group')
+            .only(*FEED_FIELDS)[:FEED_ITEMS]
+        )
+
+    def item_title(self, item):
+        return Truncator(item.text).words(10)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.id,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return (item.group.title,) if item.group_id else ()
+
+
+class GroupPostsFeed(PostsFeed):
+    """Последние посты группы."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=(obj.slug,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(PostsFeed):
+    """Последние посты автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.username}'
+
+    def description(self, obj):
+        return f'Новые посты пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+def atom(feed_class):
+    """Atom-вариант ленты feed_class."""
+    return type(
+        f'Atom{feed_class.__name__}',
+        (feed_class,),
+        {'feed_type': Atom1Feed, 'subtitle': feed_class.description},
+    )
+
+
+def cached_feed(feed_class, feed_name):
+    """View ленты с кэшем XML и условным GET по версии ленты."""
+    feed = feed_class()
+    kind = feed_class.__name__
+
+    @require_safe
+    @feed_condition(feed_name)
+    def view(request, **kwargs):
+        name = feed_name(**kwargs)
+        key = SYNDICATION_KEY.format(
+            feed=quote(name),
+            version=get_feed_version(name),
+            kind=kind,
+        )
+        cached = cache.get(key)
+        if cached is None:
+            response = feed(request, **kwargs)
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, settings.SYNDICATION_CACHE_TIMEOUT)
+        # Last-Modified ставит feed_condition по версии ленты, а не
+        # Feed по дате последнего поста: так оба заголовка согласованы.
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+    return view
+
+
+index_rss = cached_feed(PostsFeed, lambda: INDEX_FEED)
+index_atom = cached_feed(atom(PostsFeed), lambda: INDEX_FEED)
+group_rss = cached_feed(GroupPostsFeed, group_feed)
+group_atom = cached_feed(atom(GroupPostsFeed), group_feed)
+profile_rss = cached_feed(AuthorPostsFeed, profile_feed)
+profile_atom = cached_feed(atom(AuthorPostsFeed), profile_feed)
@@ -0,0 +1,59 @@
+"""Подписки пользователя: множество id авторов в кэше.
+
+Множество читается одним запросом при промахе кэша и хранится
+FOLLOW_SET_TIMEOUT секунд; сигналы Follow (подписка, отписка,
+правка в admin) удаляют его из кэша. Карточки страницы получают
+состояния подписок одним обращением к кэшу (follow_states), проверка
+каждого автора — O(1).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Follow
+
+FOLLOW_SET_KEY: str = 'follow-set:{user_id}'
+
+
+def _key(user_id):
+    return FOLLOW_SET_KEY.format(user_id=user_id)
+
+
+def get_followed_ids(user):
+    """Множество id авторов, на которых подписан user."""
+    if not user.is_authenticated:
+        return frozenset()
+    followed = cache.get(_key(user.id))
+    if followed is None:
+        followed = frozenset(
+            Follow.objects
+            .filter(user_id=user.id)
+            .values_list('author_id', flat=True)
+        )
+        cache.set(_key(user.id), followed, settings.FOLLOW_SET_TIMEOUT)
+    return followed
+
+
+def is_following(user, author_id):
+    """Подписан ли user на автора с id author_id."""
+    return author_id in get_followed_ids(user)
+
+
+def follow_states(user, author_ids):
+    """Подписан ли user на каждого из авторов: {author_id: bool}.
+
+    Анонимному пользователю и для собственных постов пользователя
+    состояния нет — такие авторы в словарь не попадают.
+    """
+    if not user.is_authenticated:
+        return {}
+    followed = get_followed_ids(user)
+    return {
+        author_id: author_id in followed
+        for author_id in author_ids
+        if author_id != user.id
+    }
+
+
+def invalidate_follow_set(user_id):
+    """Удаляет множество подписок пользователя из кэша."""
+    cache.delete(_key(user_id))
@@ -1,5 +1,6 @@
 from django.forms import ModelForm
 
+from .images import AVATAR_SIZE, POST_IMAGE_SIZE, normalize_image
 from .models import Comment, Group, Post, Profile
 
 
@@ -10,6 +11,9 @@ class PostForm(ModelForm):
         model = Post
         fields = ('text', 'group', 'image',)
 
+    def clean_image(self):
+        return normalize_image(self.cleaned_data['image'], POST_IMAGE_SIZE)
+
 
 class CommentForm(ModelForm):
     """Форма создания Comment."""
@@ -27,6 +31,9 @@ class ProfileForm(ModelForm):
         fields = '__all__'
         exclude = ('user',)
 
+    def clean_avatar(self):
+        return normalize_image(self.cleaned_data['avatar'], AVATAR_SIZE)
+
 
 class GroupForm(ModelForm):
     """Форма создания Group."""
@@ -0,0 +1,112 @@
+"""Нормализация загружаемых картинок.
+
+normalize_image() уменьшает картинку до наибольшего допустимого
+размера, поворачивает её по тегу EXIF Orientation, удаляет метаданные
+(EXIF, ICC, XMP, комментарии) и пережимает в прогрессивный JPEG или
+WebP с качеством IMAGE_QUALITY.
+
+Pillow читает файл загрузки лениво, а JPEG декодирует сразу в
+уменьшенном масштабе (draft), поэтому большой снимок не разворачивается
+в памяти целиком. Результат пишется в SpooledTemporaryFile: небольшие
+файлы остаются в памяти, большие уходят на диск.
+
+Небольшие картинки без метаданных, которые и так укладываются в
+размер, и анимации сохраняются как есть: пережатие их только портит.
+"""
+import os
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from PIL import Image, ImageOps, features
+
+POST_IMAGE_SIZE = (2048, 2048)
+AVATAR_SIZE = (512, 512)
+IMAGE_FORMATS = {
+    'JPEG': ('.jpg', 'image/jpeg'),
+    'WEBP': ('.webp', 'image/webp'),
+}
+METADATA_KEYS = ('exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp',
+                 'comment', 'photoshop')
+SPOOL_SIZE: int = 1024 * 1024
+
+
+def get_format():
+    output_format = getattr(settings, 'IMAGE_FORMAT', 'JPEG').upper()
+    # Pillow может быть собран без libwebp.
+    if output_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return output_format
+
+
+def get_quality():
+    return getattr(settings, 'IMAGE_QUALITY', 82)
+
+
+def has_metadata(image):
+    return (
+        any(key in image.info for key in METADATA_KEYS)
+        or bool(getattr(image, 'text', None))
+    )
+
+
+def needs_normalization(image, upload, max_size):
+    """Нужно ли пережимать картинку."""
+    if getattr(image, 'is_animated', False):
+        return False
+    return (
+        image.width > max_size[0]
+        or image.height > max_size[1]
+        or has_metadata(image)
+        or upload.size > getattr(settings, 'IMAGE_KEEP_BYTES', 256 * 1024)
+    )
+
+
+def flatten(image, output_format):
+    """Переводит картинку в режим, который поддерживает формат."""
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    if not has_alpha:
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    if output_format == 'WEBP':
+        return image
+    # У JPEG нет прозрачности: кладём картинку на белый фон.
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def normalize_image(upload, max_size=POST_IMAGE_SIZE):
+    """Нормализованная копия загрузки или сама загрузка, если её
+    пережимать не нужно.
+    """
+    if not isinstance(upload, UploadedFile):
+        return upload
+    upload.seek(0)
+    image = Image.open(upload)
+    if not needs_normalization(image, upload, max_size):
+        upload.seek(0)
+        return upload
+    output_format = get_format()
+    extension, content_type = IMAGE_FORMATS[output_format]
+    image.draft('RGB', max_size)
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail(max_size, Image.LANCZOS)
+    image = flatten(image, output_format)
+    image.info = {}
+
+    output = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    options = {'quality': get_quality()}
+    if output_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    else:
+        options.update(method=4)
+    image.save(output, output_format, **options)
+    size = output.tell()
+    output.seek(0)
+    name = os.path.splitext(os.path.basename(upload.name))[0] + extension
+    return UploadedFile(
+        output, name=name, content_type=content_type, size=size
+    )
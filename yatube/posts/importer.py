@@ -0,0 +1,249 @@
+"""Массовая загрузка постов и комментариев из NDJSON.
+
+Формат совпадает с выгрузкой export.py. Строки читаются потоком,
+авторы и группы ищутся через словари в памяти, посты и комментарии
+вставляются bulk_create пакетами, каждый пакет — отдельная транзакция.
+Записи получают новые id этой базы, а соответствие id выгрузки
+хранится в ImportedPost и ImportedComment: по нему комментарии находят
+свой пост, а повторная загрузка пакета после прерывания пропускает уже
+записанные строки.
+
+bulk_create не вызывает save() и сигналы: анонс поста заполняется при
+разборе записи, ленты подписок — для каждого пакета, а счётчики и кэш
+лент обновляются один раз в конце загрузки (finish). Поисковый
+индекс обновляют триггеры базы. На картинки постов добавляются ссылки
+в хранилище (core.storage.retain), картинки, которых в этом хранилище
+нет, не загружаются.
+"""
+import json
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from core.storage import retain
+
+from . import timeline
+from .caching import INDEX_FEED, group_feed, profile_feed, touch_feeds
+from .counters import recount_counters
+from .models import (Comment, Group, ImportedComment, ImportedPost, Post,
+                     User, make_excerpt)
+
+IMPORT_BATCH_SIZE: int = 1000
+CHECK_CHUNK_SIZE: int = 500
+
+
+def bulk_insert(objects, batch_size, date_field):
+    """Вставляет объекты одной модели и проставляет им id, сохраняя
+    дату date_field из объектов. Вызывается внутри transaction.atomic().
+
+    bulk_create заменяет поле с auto_now_add текущим временем, поэтому
+    исходные даты записываются следующим bulk_update. SQLite не
+    возвращает id из bulk_create, но вставка держит блокировку записи
+    до конца транзакции: последние len(objects) id таблицы — наши, в
+    порядке вставки.
+    """
+    if not objects:
+        return objects
+    model = type(objects[0])
+    dates = [getattr(obj, date_field) for obj in objects]
+    model.objects.bulk_create(objects, batch_size)
+    if objects[0].pk is None:
+        ids = list(
+            model.objects
+            .order_by('-pk')
+            .values_list('pk', flat=True)[:len(objects)]
+        )
+        for obj, pk in zip(objects, reversed(ids)):
+            obj.pk = pk
+    for obj, date in zip(objects, dates):
+        if date is not None:
+            setattr(obj, date_field, date)
+    model.objects.bulk_update(objects, [date_field], batch_size)
+    return objects
+
+
+class PostImporter:
+    """Пакетная загрузка записей выгрузки в базу."""
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE, source=''):
+        self.batch_size = batch_size
+        self.source = source
+        self.users = {}
+        self.groups = {}
+        # id записи в выгрузке -> ещё не записанный объект.
+        self.posts = {}
+        self.comments = {}
+        self.imported = 0
+        self.skipped = 0
+
+    def pending(self):
+        """Сколько записей ждёт вставки."""
+        return len(self.posts) + len(self.comments)
+
+    def user_id(self, username):
+        if username not in self.users:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                # create_user создаёт и профиль через сигнал post_save.
+                user = User.objects.create_user(username)
+            self.users[username] = user.id
+        return self.users[username]
+
+    def group_id(self, slug, defaults=None):
+        if slug is None:
+            return None
+        if slug not in self.groups:
+            group, _ = Group.objects.get_or_create(
+                slug=slug,
+                defaults=defaults or {'title': slug, 'description': ''},
+            )
+            self.groups[slug] = group.id
+        return self.groups[slug]
+
+    def add(self, record):
+        """Принимает одну запись выгрузки, возвращает True, если пакет
+        набран и его пора записать через flush().
+        """
+        record_type = record.get('type')
+        if record_type == 'group':
+            self.group_id(record['slug'], {
+                'title': record['title'],
+                'description': record['description'],
+            })
+        elif record_type == 'post':
+            self.posts[record['id']] = Post(
+                author_id=self.user_id(record['author']),
+                group_id=self.group_id(record.get('group')),
+                text=record['text'],
+                excerpt=make_excerpt(record['text']),
+                pub_date=parse_datetime(record['pub_date']),
+                image=record.get('image') or '',
+            )
+        elif record_type == 'comment':
+            # post_id пока id поста в выгрузке, см. insert_comments().
+            self.comments[record['id']] = Comment(
+                post_id=record['post'],
+                author_id=self.user_id(record['author']),
+                text=record['text'],
+                created=parse_datetime(record['created']),
+            )
+        else:
+            self.skipped += 1
+        return self.pending() >= self.batch_size
+
+    def known_ids(self, model, source_ids, field):
+        """Словарь id выгрузки -> id объекта для уже загруженных
+        записей этого источника.
+        """
+        source_ids = sorted(set(source_ids))
+        known = {}
+        # Порциями, чтобы не упереться в лимит параметров SQLite.
+        for start in range(0, len(source_ids), CHECK_CHUNK_SIZE):
+            known.update(
+                model.objects
+                .filter(
+                    source=self.source,
+                    source_id__in=source_ids[start:start + CHECK_CHUNK_SIZE],
+                )
+                .values_list('source_id', field)
+            )
+        return known
+
+    def insert_posts(self):
+        """Записывает новые посты пакета, возвращает их с id."""
+        known = self.known_ids(ImportedPost, self.posts, 'post_id')
+        new = {
+            source_id: post for source_id, post in self.posts.items()
+            if source_id not in known
+        }
+        self.retain_images(new.values())
+        posts = bulk_insert(list(new.values()), self.batch_size, 'pub_date')
+        ImportedPost.objects.bulk_create(
+            [
+                ImportedPost(
+                    source=self.source, source_id=source_id, post_id=post.id
+                )
+                for source_id, post in new.items()
+            ],
+            self.batch_size,
+        )
+        self.skipped += len(self.posts) - len(new)
+        return posts
+
+    def retain_images(self, posts):
+        """Добавляет ссылки на картинки постов и убирает картинки,
+        которых нет в хранилище: иначе удаление копии снимет ссылку
+        исходного поста вместе с его файлом.
+        """
+        posts = [post for post in posts if post.image]
+        kept = retain(
+            Post._meta.get_field('image').storage,
+            [post.image.name for post in posts],
+        )
+        for post in posts:
+            if post.image.name not in kept:
+                post.image = ''
+
+    def insert_comments(self):
+        """Записывает новые комментарии пакета к загруженным постам:
+        комментарии к отсутствующим постам пропускаются.
+        """
+        known = self.known_ids(ImportedComment, self.comments, 'comment_id')
+        post_ids = self.known_ids(
+            ImportedPost,
+            (comment.post_id for comment in self.comments.values()),
+            'post_id',
+        )
+        new = {}
+        for source_id, comment in self.comments.items():
+            if source_id in known or comment.post_id not in post_ids:
+                continue
+            comment.post_id = post_ids[comment.post_id]
+            new[source_id] = comment
+        comments = bulk_insert(
+            list(new.values()), self.batch_size, 'created'
+        )
+        ImportedComment.objects.bulk_create(
+            [
+                ImportedComment(
+                    source=self.source,
+                    source_id=source_id,
+                    comment_id=comment.id,
+                )
+                for source_id, comment in new.items()
+            ],
+            self.batch_size,
+        )
+        self.skipped += len(self.comments) - len(new)
+        return comments
+
+    def flush(self):
+        """Записывает накопленный пакет одной транзакцией и раскладывает
+        новые посты в ленты подписчиков.
+        """
+        with transaction.atomic():
+            posts = self.insert_posts()
+            comments = self.insert_comments()
+            timeline.fan_out_posts(posts)
+        self.imported += len(posts) + len(comments)
+        self.posts = {}
+        self.comments = {}
+
+    def finish(self):
+        """Записывает остаток, пересчитывает счётчики и сбрасывает кэш."""
+        self.flush()
+        with transaction.atomic():
+            recount_counters()
+        touch_feeds(
+            INDEX_FEED,
+            *map(profile_feed, self.users),
+            *map(group_feed, self.groups),
+        )
+
+
+def parse_line(line):
+    """Запись выгрузки из строки NDJSON или None для пустой строки."""
+    if isinstance(line, bytes):
+        line = line.decode('utf-8')
+    line = line.strip()
+    return json.loads(line) if line else None
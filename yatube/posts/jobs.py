@@ -0,0 +1,9 @@
+from core.queue import job
+
+from . import thumbnails
+
+
+@job(queue='thumbnails')
+def generate_thumbnails(name, kind):
+    """Создание миниатюр загруженной картинки вне запроса."""
+    thumbnails.generate_thumbnails(name, kind)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from posts.caching import INDEX_FEED, group_feed, profile_feed, touch_feeds
+from posts.models import EXCERPT_BATCH_SIZE, Post, fill_excerpts
+
+
+class Command(BaseCommand):
+    help = ('Заполняет анонсы постов, созданных до появления поля excerpt '
+            'или изменённых в обход save().')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EXCERPT_BATCH_SIZE,
+            help='Сколько постов читать и обновлять за один раз.',
+        )
+
+    def handle(self, *args, **options):
+        posts = (
+            Post.objects
+            .select_related('author', 'group')
+            .only(
+                'id', 'text', 'excerpt', 'updated',
+                'author__username', 'group__slug',
+            )
+        )
+        updated = 0
+        feeds = set()
+        for changed in fill_excerpts(posts, options['batch_size']):
+            updated += len(changed)
+            for post in changed:
+                feeds.add(profile_feed(post.author.username))
+                if post.group is not None:
+                    feeds.add(group_feed(post.group.slug))
+        if updated:
+            # bulk_update не вызывает сигналы: кэш лент сбрасывается здесь.
+            touch_feeds(INDEX_FEED, *feeds)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено анонсов: {updated}'
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import EXPORT_CHUNK_SIZE, export_lines
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = ('Выгружает посты и комментарии в NDJSON: все данные '
+            'или только одного автора.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--author',
+            help='Имя пользователя, чьи посты и комментарии выгрузить.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для выгрузки, по умолчанию — стандартный вывод.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Сколько строк читать из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        author = None
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+            if author is None:
+                raise CommandError(
+                    f'Пользователь {options["author"]} не найден.'
+                )
+        lines = export_lines(author, options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            output.writelines(lines)
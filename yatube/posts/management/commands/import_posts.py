@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importer import IMPORT_BATCH_SIZE, PostImporter, parse_line
+
+
+class Command(BaseCommand):
+    help = ('Загружает посты и комментарии из NDJSON (формат '
+            'export_posts) пакетами bulk_create с продолжением после '
+            'прерывания.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            help='Файл NDJSON или «-» для стандартного ввода.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help='Сколько записей вставлять одной транзакцией.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл с позицией последнего записанного пакета, '
+                 'по умолчанию <path>.checkpoint.',
+        )
+        parser.add_argument(
+            '--source',
+            help='Имя выгрузки для сопоставления её id с записями базы, '
+                 'по умолчанию имя файла. Повторная загрузка с тем же '
+                 'именем пропускает уже записанные посты и комментарии.',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Начать загрузку с начала, игнорируя checkpoint.',
+        )
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as checkpoint:
+                return int(checkpoint.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except ValueError:
+            raise CommandError(f'Повреждён файл checkpoint {path}.')
+
+    def write_checkpoint(self, path, offset):
+        # Запись через временный файл, чтобы прерывание не оставило
+        # checkpoint пустым.
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as checkpoint:
+            checkpoint.write(str(offset))
+        os.replace(temporary, path)
+
+    def report(self, importer, started, line_number):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'Строк: {line_number}, записано: {importer.imported}, '
+            f'{importer.imported / elapsed:.0f} записей/с.'
+        )
+
+    def open_source(self, options):
+        """Источник строк и путь checkpoint (None для stdin)."""
+        path = options['path']
+        if path == '-':
+            return sys.stdin.buffer, None
+        try:
+            source = open(path, 'rb')
+        except OSError as error:
+            raise CommandError(error)
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        if not options['restart']:
+            offset = self.read_checkpoint(checkpoint)
+            if offset:
+                self.stdout.write(f'Продолжение с позиции {offset}.')
+                source.seek(offset)
+        return source, checkpoint
+
+    def import_lines(self, source, importer, checkpoint, verbosity):
+        started = time.monotonic()
+        line_number = 0
+        for line in iter(source.readline, b''):
+            line_number += 1
+            try:
+                record = parse_line(line)
+            except ValueError:
+                raise CommandError(
+                    f'Некорректный JSON в строке {line_number}.'
+                )
+            if record is None or not importer.add(record):
+                continue
+            importer.flush()
+            if checkpoint:
+                self.write_checkpoint(checkpoint, source.tell())
+            if verbosity > 1:
+                self.report(importer, started, line_number)
+
+    def handle(self, *args, **options):
+        importer = PostImporter(
+            options['batch_size'],
+            options['source'] or os.path.basename(options['path']),
+        )
+        source, checkpoint = self.open_source(options)
+        started = time.monotonic()
+        try:
+            self.import_lines(
+                source, importer, checkpoint, options['verbosity']
+            )
+        finally:
+            if checkpoint:
+                source.close()
+        importer.finish()
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано: {importer.imported}, пропущено: {importer.skipped}, '
+            f'время: {elapsed:.1f} с, '
+            f'{importer.imported / elapsed:.0f} записей/с.'
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import recount_counters
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики постов, комментариев, подписчиков '
+            'и подписок по фактическим данным.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            recount_counters()
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны.'))
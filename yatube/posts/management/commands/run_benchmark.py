@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.benchmark import BenchmarkError, run
+
+
+class Command(BaseCommand):
+    help = ('Открывает адреса posts.urls, которые ничего не меняют, '
+            'тестовым клиентом и сообщает p50/p95 времени ответа и '
+            'число запросов к базе.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Сколько раз открыть каждый адрес.',
+        )
+        parser.add_argument(
+            '--anonymous',
+            action='store_true',
+            help='Без входа на сайт: только публичные страницы.',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кэш перед каждым запросом.',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл JSON для сравнения прогонов.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = run(
+                repeat=options['repeat'],
+                anonymous=options['anonymous'],
+                cold=options['cold'],
+            )
+        except BenchmarkError as error:
+            raise CommandError(error)
+        self.stdout.write(
+            f'{"view":<20} {"status":>6} {"p50, мс":>9} {"p95, мс":>9} '
+            f'{"запросов":>8}'
+        )
+        for name, result in report['views'].items():
+            self.stdout.write(
+                f'{name:<20} {result["status"]:>6} {result["p50_ms"]:>9} '
+                f'{result["p95_ms"]:>9} {result["queries"]:>8}'
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(
+                f'Результаты записаны в {options["output"]}.'
+            ))
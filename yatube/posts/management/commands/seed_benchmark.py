@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.benchmark import seed
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими пользователями, группами, '
+            'постами и подписками для бенчмарка run_benchmark.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=1.2,
+            help='Параметр распределения Парето: чем меньше, тем больше '
+                 'подписчиков и постов у самых популярных авторов.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Начальное значение генератора случайных чисел.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        created = seed(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            alpha=options['alpha'],
+            random_seed=options['seed'],
+        )
+        elapsed = time.monotonic() - started
+        summary = ', '.join(f'{name}: {count}'
+                            for name, count in created.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'{summary}, время: {elapsed:.1f} с.'
+        ))
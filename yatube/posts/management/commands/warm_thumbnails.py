@@ -0,0 +1,64 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import DEFAULT_AVATAR, Post, Profile
+from posts.thumbnails import init_worker, warm_file
+
+
+class Command(BaseCommand):
+    help = ('Создаёт миниатюры всех картинок постов и аватаров '
+            'параллельно в пуле процессов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Количество процессов пула.',
+        )
+        parser.add_argument(
+            '--chunksize',
+            type=int,
+            default=16,
+            help='Сколько файлов отдавать процессу за раз.',
+        )
+
+    def get_tasks(self):
+        images = (
+            Post.objects
+            .exclude(image='')
+            .values_list('image', flat=True)
+            .distinct()
+        )
+        avatars = (
+            Profile.objects
+            .exclude(avatar=DEFAULT_AVATAR)
+            .values_list('avatar', flat=True)
+            .distinct()
+        )
+        tasks = [(name, 'post') for name in images.iterator()]
+        tasks += [(name, 'avatar') for name in avatars.iterator()]
+        return tasks
+
+    def handle(self, *args, **options):
+        tasks = self.get_tasks()
+        # Процессы пула открывают свои соединения с базой,
+        # унаследованные от родителя использовать нельзя.
+        connections.close_all()
+        started = time.monotonic()
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            initializer=init_worker,
+        ) as executor:
+            created = sum(executor.map(
+                warm_file, tasks, chunksize=options['chunksize']
+            ))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Файлов: {len(tasks)}, миниатюр: {created}, '
+            f'время: {elapsed:.1f} с.'
+        ))
@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:51
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_timeline(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    for user_id, author_id in Follow.objects.values_list('user_id', 'author_id'):
+        posts = Post.objects.filter(author_id=author_id).values_list('id', 'pub_date')
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(user_id=user_id, post_id=post_id, author_id=author_id, pub_date=pub_date)
+                for post_id, pub_date in posts
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0024_auto_20220822_0940'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pub_date', models.DateTimeField(help_text='Копия даты публикации поста для сортировки ленты', verbose_name='Дата публикации')),
+                ('author', models.ForeignKey(help_text='Автор поста, нужен для удаления записей при отписке', on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор поста')),
+                ('post', models.ForeignKey(help_text='Пост автора, на которого подписан пользователь', on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(help_text='Пользователь, в ленту которого попал пост', on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Подписчик')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты',
+                'verbose_name_plural': 'Записи ленты',
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', '-pub_date'], name='timeline_user_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(fields=['user', 'author'], name='timeline_user_author_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together={('user', 'post')},
+        ),
+        migrations.RunPython(backfill_timeline, migrations.RunPython.noop),
+    ]
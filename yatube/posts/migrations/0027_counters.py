@@ -0,0 +1,68 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_of(model, foreign_key, outer_field='pk'):
+    counts = (
+        model.objects
+        .filter(**{foreign_key: OuterRef(outer_field)})
+        .order_by()
+        .values(foreign_key)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+def fill_counters(apps, schema_editor):
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    Profile = apps.get_model('posts', 'Profile')
+    Profile.objects.update(
+        posts_count=count_of(Post, 'author_id', 'user_id'),
+        followers_count=count_of(Follow, 'author_id', 'user_id'),
+        following_count=count_of(Follow, 'user_id', 'user_id'),
+    )
+    Group.objects.update(posts_count=count_of(Post, 'group_id'))
+    Post.objects.update(comments_count=count_of(Comment, 'post_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Поддерживается сигналами, пересчёт: recount_counters', verbose_name='Количество постов'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Поддерживается сигналами, пересчёт: recount_counters', verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Поддерживается сигналами, пересчёт: recount_counters', verbose_name='Количество подписчиков'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Поддерживается сигналами, пересчёт: recount_counters', verbose_name='Количество подписок'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Поддерживается сигналами, пересчёт: recount_counters', verbose_name='Количество постов'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:57
+
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    keep_ids = (
+        Follow.objects
+        .values('user_id', 'author_id')
+        .annotate(keep_id=Min('id'))
+        .values_list('keep_id', flat=True)
+    )
+    Follow.objects.exclude(id__in=list(keep_ids)).delete()
+    # 0027 посчитал подписки вместе с дубликатами.
+    Profile = apps.get_model('posts', 'Profile')
+    Profile.objects.update(
+        followers_count=count_of(Follow, 'author_id'),
+        following_count=count_of(Follow, 'user_id'),
+    )
+
+
+def count_of(model, foreign_key):
+    counts = (
+        model.objects
+        .filter(**{foreign_key: OuterRef('user_id')})
+        .order_by()
+        .values(foreign_key)
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(counts), Value(0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0027_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_follows, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ['-pub_date', '-id'], 'verbose_name': 'Пост', 'verbose_name_plural': 'Посты'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created'], name='comment_post_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date', '-id'], name='post_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date', '-id'], name='post_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date', '-id'], name='post_group_pub_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(fields=('user', 'author'), name='unique_follow'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from posts.search import drop_search_index, install_search_index
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove_search_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0028_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, remove_search_index),
+    ]
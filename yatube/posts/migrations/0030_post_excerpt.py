@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+from posts.models import EXCERPT_BATCH_SIZE, fill_excerpts
+
+
+def backfill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.only('id', 'text', 'excerpt', 'updated')
+    for _ in fill_excerpts(posts, EXCERPT_BATCH_SIZE):
+        pass
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0029_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, help_text='Начало текста для карточек, обновляется при сохранении', max_length=160, verbose_name='Анонс'),
+        ),
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0030_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportedPost',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Имя выгрузки, из которой загружена запись', max_length=255, verbose_name='Источник')),
+                ('source_id', models.BigIntegerField(help_text='id записи в базе, из которой сделана выгрузка', verbose_name='id в выгрузке')),
+                ('post', models.OneToOneField(help_text='Пост, созданный загрузкой', on_delete=django.db.models.deletion.CASCADE, related_name='import_source', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Загруженный пост',
+                'verbose_name_plural': 'Загруженные посты',
+                'abstract': False,
+                'unique_together': {('source', 'source_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportedComment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Имя выгрузки, из которой загружена запись', max_length=255, verbose_name='Источник')),
+                ('source_id', models.BigIntegerField(help_text='id записи в базе, из которой сделана выгрузка', verbose_name='id в выгрузке')),
+                ('comment', models.OneToOneField(help_text='Комментарий, созданный загрузкой', on_delete=django.db.models.deletion.CASCADE, related_name='import_source', to='posts.Comment', verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'Загруженный комментарий',
+                'verbose_name_plural': 'Загруженные комментарии',
+                'abstract': False,
+                'unique_together': {('source', 'source_id')},
+            },
+        ),
+    ]
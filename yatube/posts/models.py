@@ -1,10 +1,54 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.text import Truncator
 
 User = get_user_model()
 
+EXCERPT_LENGTH: int = 160
+EXCERPT_BATCH_SIZE: int = 1000
+# Аватар профиля, пока пользователь не загрузил свой. Файла в MEDIA
+# нет, поэтому миниатюры для него не строятся и карточки его не
+# показывают.
+DEFAULT_AVATAR: str = 'default_avatar.png'
+
+
+def make_excerpt(text):
+    """Анонс поста для карточек: как truncatechars:160 в шаблоне."""
+    return Truncator(text).chars(EXCERPT_LENGTH)
+
+
+def fill_excerpts(posts, batch_size):
+    """Заполняет устаревшие анонсы постов из posts порциями по id и
+    отдаёт изменённые посты каждой порции.
+
+    posts — queryset с полями id, text, excerpt и updated: функцию
+    вызывает и миграция 0030 с исторической моделью. updated меняется,
+    чтобы сбросить кэш карточек постов.
+    """
+    last_id = 0
+    while True:
+        # Порции по id: память не растёт с размером таблицы.
+        batch = list(
+            posts.filter(id__gt=last_id).order_by('id')[:batch_size]
+        )
+        if not batch:
+            return
+        last_id = batch[-1].id
+        changed = []
+        now = timezone.now()
+        for post in batch:
+            excerpt = make_excerpt(post.text)
+            if post.excerpt != excerpt:
+                post.excerpt = excerpt
+                post.updated = now
+                changed.append(post)
+        with transaction.atomic():
+            posts.model.objects.bulk_update(changed, ['excerpt', 'updated'])
+        yield changed
+
 
 class Group(models.Model):
     """Модель создание групп для постов."""
@@ -32,6 +76,12 @@ class Group(models.Model):
         verbose_name='Описание группы',
         help_text='Описание, которое будет отображаться на странице группы',
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество постов',
+        help_text='Поддерживается сигналами, пересчёт: recount_counters',
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -47,11 +97,23 @@ class Post(models.Model):
         verbose_name='Текст поста',
         help_text='Введите текст поста',
     )
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Анонс',
+        help_text='Начало текста для карточек, обновляется при сохранении',
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации',
         help_text='Дата публикации поста',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения',
+        help_text='Дата последнего изменения поста',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -74,15 +136,43 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True,
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+        help_text='Поддерживается сигналами, пересчёт: recount_counters',
+    )
 
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:30]
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     """Модель для написания комментариев к постам."""
@@ -113,6 +203,12 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created'],
+                name='comment_post_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:30]
@@ -139,6 +235,12 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow',
+            ),
+        ]
 
 
 class Profile(models.Model):
@@ -152,12 +254,30 @@ class Profile(models.Model):
     )
     avatar = models.ImageField(
         verbose_name='Аватар',
-        default='default_avatar.png',
+        default=DEFAULT_AVATAR,
         help_text='Выберете картинку для аватара',
         upload_to='posts/avatar',
         blank=False,
         null=False,
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество постов',
+        help_text='Поддерживается сигналами, пересчёт: recount_counters',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписчиков',
+        help_text='Поддерживается сигналами, пересчёт: recount_counters',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество подписок',
+        help_text='Поддерживается сигналами, пересчёт: recount_counters',
+    )
 
     class Meta:
         verbose_name = 'Аватар'
@@ -167,6 +287,103 @@ class Profile(models.Model):
         return self.user.username
 
 
+class TimelineEntry(models.Model):
+    """Модель ленты подписок: пост автора, разложенный подписчику."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+        help_text='Пользователь, в ленту которого попал пост'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Пост',
+        help_text='Пост автора, на которого подписан пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор поста',
+        help_text='Автор поста, нужен для удаления записей при отписке'
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        help_text='Копия даты публикации поста для сортировки ленты'
+    )
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date'],
+                name='timeline_user_pub_date_idx',
+            ),
+            models.Index(
+                fields=['user', 'author'],
+                name='timeline_user_author_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} <- {self.post}'
+
+
+class ImportedRecord(models.Model):
+    """Соответствие id записи выгрузки и объекта в этой базе."""
+    source = models.CharField(
+        max_length=255,
+        verbose_name='Источник',
+        help_text='Имя выгрузки, из которой загружена запись'
+    )
+    source_id = models.BigIntegerField(
+        verbose_name='id в выгрузке',
+        help_text='id записи в базе, из которой сделана выгрузка'
+    )
+
+    class Meta:
+        abstract = True
+        unique_together = ('source', 'source_id')
+
+
+class ImportedPost(ImportedRecord):
+    """Модель загруженного поста: по ней повторная загрузка пропускает
+    уже записанные посты, а комментарии находят свой пост.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='import_source',
+        verbose_name='Пост',
+        help_text='Пост, созданный загрузкой'
+    )
+
+    class Meta(ImportedRecord.Meta):
+        verbose_name = 'Загруженный пост'
+        verbose_name_plural = 'Загруженные посты'
+
+
+class ImportedComment(ImportedRecord):
+    """Модель загруженного комментария."""
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='import_source',
+        verbose_name='Комментарий',
+        help_text='Комментарий, созданный загрузкой'
+    )
+
+    class Meta(ImportedRecord.Meta):
+        verbose_name = 'Загруженный комментарий'
+        verbose_name_plural = 'Загруженные комментарии'
+
+
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
     if created:
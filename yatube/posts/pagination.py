@@ -0,0 +1,137 @@
+"""Курсорная (keyset) пагинация по паре (поле даты, id).
+
+В отличие от Paginator не выполняет COUNT(*) и не использует OFFSET:
+каждая страница выбирается условием «строго после/до курсора» по
+индексу, поэтому страница 5000 стоит столько же, сколько первая.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def keyset_enabled():
+    """Включена ли курсорная пагинация в настройках проекта."""
+    return getattr(settings, 'POSTS_KEYSET_PAGINATION', False)
+
+
+class KeysetPage:
+    """Страница курсорной пагинации с интерфейсом, похожим на Page."""
+    is_keyset = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Разбиение queryset на страницы по курсору (field, pk)."""
+
+    def __init__(self, queryset, per_page, field='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу по курсору, при ошибке — первую страницу."""
+        position = self.decode_cursor(cursor)
+        if position is None:
+            return self._forward_page(None, is_first=True)
+        direction, value, pk = position
+        if direction == 'p':
+            return self._backward_page((value, pk))
+        return self._forward_page((value, pk))
+
+    def _ordering(self, reverse=False):
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        return (f'{prefix}{self.field}', f'{prefix}pk')
+
+    def _after(self, value, pk, reverse=False):
+        """Условие «строго после (value, pk)» в порядке выдачи."""
+        descending = self.descending != reverse
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _forward_page(self, position, is_first=False):
+        queryset = self.queryset.order_by(*self._ordering())
+        if position is not None:
+            queryset = queryset.filter(self._after(*position))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor('n', rows[-1]) if has_more else None,
+            previous_cursor=(
+                None if is_first or not rows else self._cursor('p', rows[0])
+            ),
+        )
+
+    def _backward_page(self, position):
+        queryset = (
+            self.queryset
+            .order_by(*self._ordering(reverse=True))
+            .filter(self._after(*position, reverse=True))
+        )
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        if not rows:
+            return self._forward_page(None, is_first=True)
+        return KeysetPage(
+            rows,
+            next_cursor=self._cursor('n', rows[-1]),
+            previous_cursor=self._cursor('p', rows[0]) if has_more else None,
+        )
+
+    def _cursor(self, direction, obj):
+        value = getattr(obj, self.field)
+        raw = json.dumps([direction, value.isoformat(), obj.pk])
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Разбирает курсор в (направление, значение, pk) или None."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode())
+            direction, value, pk = json.loads(raw.decode())
+            field = self.queryset.model._meta.get_field(self.field)
+            value = field.to_python(value)
+            pk = int(pk)
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        if direction not in ('n', 'p') or value is None:
+            return None
+        return direction, value, pk
@@ -0,0 +1,152 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Индекс posts_post_fts хранит только токены текста (external content
+таблица над posts_post), синхронизацию при вставке, изменении и
+удалении постов выполняют триггеры базы, поэтому индекс не отстаёт
+и при bulk_create или queryset.update().
+"""
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+SEARCH_TABLE: str = 'posts_post_fts'
+
+SEARCH_SCHEMA = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {SEARCH_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+SEARCH_TRIGGERS = tuple(
+    f'{SEARCH_TABLE}_{action}' for action in ('insert', 'delete', 'update')
+)
+
+
+def search_available(using=None):
+    """Поиск через FTS5 возможен только на SQLite."""
+    return (using or connection).vendor == 'sqlite'
+
+
+def install_search_index(using=None):
+    """Создаёт индекс и триггеры, если их нет, и перестраивает индекс.
+
+    SQLite пересоздаёт таблицу posts_post при части миграций, вместе со
+    старой таблицей пропадают и триггеры — тогда индекс строится заново.
+    """
+    db = using or connection
+    if not search_available(db):
+        return
+    with db.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'posts_post'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing.issuperset(SEARCH_TRIGGERS):
+            return
+        for statement in SEARCH_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"
+        )
+
+
+def drop_search_index(using=None):
+    """Удаляет индекс и триггеры."""
+    db = using or connection
+    if not search_available(db):
+        return
+    with db.cursor() as cursor:
+        for trigger in SEARCH_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        cursor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+def match_expression(query):
+    """Строка запроса пользователя в безопасное выражение MATCH.
+
+    Каждое слово ищется как префикс, поэтому «пост» находит «постов»;
+    служебный синтаксис FTS5 в запросе пользователя экранируется.
+    """
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"*' for term in terms if term)
+
+
+def matching_ids(query):
+    """Выражение id постов, подходящих под запрос, для фильтра pk__in."""
+    return RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        (match_expression(query),),
+    )
+
+
+class PostSearchResults:
+    """Результаты поиска, отсортированные по релевантности (bm25).
+
+    Поддерживает count() и срезы, поэтому передаётся в Paginator как
+    обычный queryset: страница — один запрос к индексу и один к постам.
+    """
+
+    def __init__(self, query, queryset=None):
+        self.match = match_expression(query)
+        self.queryset = (
+            queryset if queryset is not None else Post.objects.all()
+        )
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s',
+                (self.match,),
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start = index.start or 0
+        limit = -1 if index.stop is None else index.stop - start
+        if not self.match or limit == 0:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} '
+                f'WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                (self.match, limit, start),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[post_id] for post_id in ids if post_id in posts]
@@ -0,0 +1,308 @@
+from django.db import connections, transaction
+from django.db.models.signals import (post_delete, post_migrate, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from core.storage import release
+
+from . import timeline
+from .caching import (INDEX_FEED, comments_feed, group_feed, post_feed,
+                      profile_feed, touch_feeds)
+from .counters import increment
+from .follows import invalidate_follow_set
+from .jobs import generate_thumbnails
+from .models import (DEFAULT_AVATAR, Comment, Follow, Group, Post, Profile,
+                     User)
+from .search import install_search_index
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    """Новый пост попадает в ленты подписчиков автора."""
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_new_follow(sender, instance, created, **kwargs):
+    """Новая подписка заполняет ленту постами автора."""
+    if created:
+        timeline.backfill_follow(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def clear_removed_follow(sender, instance, **kwargs):
+    """Отписка убирает посты автора из ленты."""
+    timeline.remove_follow(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_follow_set(sender, instance, **kwargs):
+    """Сбрасывает кэш подписок пользователя."""
+    invalidate_follow_set(instance.user_id)
+
+
+def is_uploading(field_file):
+    """True, если в поле новый файл, который запишется при сохранении."""
+    return bool(field_file) and not field_file._committed
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_group(sender, instance, **kwargs):
+    """Запоминает прежние группу и картинку редактируемого поста."""
+    instance._previous_group_id = None
+    instance._previous_image = ''
+    instance._image_uploaded = is_uploading(instance.image)
+    if not instance._state.adding:
+        previous = (
+            Post.objects
+            .filter(pk=instance.pk)
+            .values_list('group_id', 'image')
+            .first()
+        )
+        if previous is not None:
+            instance._previous_group_id, instance._previous_image = previous
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def touch_post_feeds(sender, instance, **kwargs):
+    """Сбрасывает кэш главной, ленты автора, групп и самого поста."""
+    group_ids = {
+        instance.group_id,
+        getattr(instance, '_previous_group_id', None),
+    } - {None}
+    slugs = Group.objects.filter(id__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    author = User.objects.filter(id=instance.author_id).values_list(
+        'username', flat=True
+    )
+    touch_feeds(
+        INDEX_FEED,
+        post_feed(instance.pk),
+        *map(profile_feed, author),
+        *map(group_feed, slugs),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_comment_feeds(sender, instance, **kwargs):
+    """Сбрасывает кэш поста с изменёнными комментариями и версии
+    счётчиков комментариев в лентах API, где виден этот пост.
+    """
+    feeds = [post_feed(instance.post_id)]
+    post = (
+        Post.objects
+        .filter(id=instance.post_id)
+        .values_list('author__username', 'group__slug')
+        .first()
+    )
+    if post is not None:
+        username, slug = post
+        lists = [INDEX_FEED, profile_feed(username)]
+        if slug is not None:
+            lists.append(group_feed(slug))
+        feeds += map(comments_feed, lists)
+    touch_feeds(*feeds)
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, **kwargs):
+    """Запоминает прежний slug редактируемой группы."""
+    instance._previous_slug = None
+    if not instance._state.adding:
+        instance._previous_slug = (
+            Group.objects
+            .filter(pk=instance.pk)
+            .values_list('slug', flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def touch_group_feeds(sender, instance, created=False, **kwargs):
+    """Сбрасывает кэш ленты группы и лент, где видны её посты."""
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)}
+    feeds = [group_feed(slug) for slug in slugs - {None}]
+    if not created:
+        authors = (
+            User.objects
+            .filter(posts__group_id=instance.pk)
+            .distinct()
+            .values_list('username', flat=True)
+        )
+        post_ids = Post.objects.filter(group_id=instance.pk).values_list(
+            'id', flat=True
+        )
+        feeds += [
+            INDEX_FEED,
+            *map(profile_feed, authors),
+            *map(post_feed, post_ids),
+        ]
+    touch_feeds(*feeds)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def touch_profile_feeds(sender, instance, created=False, **kwargs):
+    """Сбрасывает кэш лент, где виден аватар автора."""
+    if created:
+        return
+    slugs = (
+        Group.objects
+        .filter(posts__author_id=instance.user_id)
+        .distinct()
+        .values_list('slug', flat=True)
+    )
+    author = User.objects.filter(id=instance.user_id).values_list(
+        'username', flat=True
+    )
+    touch_feeds(
+        INDEX_FEED,
+        *map(profile_feed, author),
+        *map(group_feed, slugs),
+    )
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """Обновляет счётчики постов автора и групп."""
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if created:
+        increment(Profile.objects.filter(user_id=instance.author_id),
+                  'posts_count')
+    elif previous_group_id == instance.group_id:
+        return
+    elif previous_group_id is not None:
+        increment(Group.objects.filter(id=previous_group_id),
+                  'posts_count', -1)
+    if instance.group_id is not None:
+        increment(Group.objects.filter(id=instance.group_id), 'posts_count')
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    """Уменьшает счётчики постов автора и группы."""
+    increment(Profile.objects.filter(user_id=instance.author_id),
+              'posts_count', -1)
+    if instance.group_id is not None:
+        increment(Group.objects.filter(id=instance.group_id),
+                  'posts_count', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    """Увеличивает счётчик комментариев поста."""
+    if created:
+        increment(Post.objects.filter(id=instance.post_id), 'comments_count')
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    """Уменьшает счётчик комментариев поста."""
+    increment(Post.objects.filter(id=instance.post_id),
+              'comments_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def count_follow(sender, instance, created=None, **kwargs):
+    """Обновляет счётчики подписчиков автора и подписок пользователя."""
+    if created is False:
+        return
+    delta = 1 if created else -1
+    increment(Profile.objects.filter(user_id=instance.author_id),
+              'followers_count', delta)
+    increment(Profile.objects.filter(user_id=instance.user_id),
+              'following_count', delta)
+    author = User.objects.filter(id=instance.author_id).values_list(
+        'username', flat=True
+    )
+    touch_feeds(*map(profile_feed, author))
+
+
+@receiver(post_save, sender=Post)
+def warm_post_thumbnails(sender, instance, **kwargs):
+    """Ставит в очередь создание миниатюр картинки поста."""
+    if instance.image:
+        generate_thumbnails.delay(name=instance.image.name, kind='post')
+
+
+@receiver(post_save, sender=Profile)
+def warm_avatar_thumbnails(sender, instance, **kwargs):
+    """Ставит в очередь создание миниатюр аватара."""
+    if instance.avatar and instance.avatar.name != DEFAULT_AVATAR:
+        generate_thumbnails.delay(name=instance.avatar.name, kind='avatar')
+
+
+def release_on_commit(field_file, name):
+    """Снимает ссылку на файл после фиксации транзакции: при откате
+    файл остаётся нужен.
+    """
+    storage = field_file.storage
+    transaction.on_commit(lambda: release(storage, name))
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, **kwargs):
+    """Освобождает прежнюю картинку, если её заменили или убрали.
+
+    Загрузка файла с тем же содержимым даёт то же имя, но save()
+    хранилища уже добавил ссылку, поэтому прежняя тоже снимается.
+    """
+    previous = getattr(instance, '_previous_image', '')
+    uploaded = getattr(instance, '_image_uploaded', False)
+    if previous and (uploaded or previous != instance.image.name):
+        release_on_commit(instance.image, previous)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    """Освобождает картинку удалённого поста."""
+    if instance.image:
+        release_on_commit(instance.image, instance.image.name)
+
+
+@receiver(pre_save, sender=Profile)
+def remember_profile_avatar(sender, instance, **kwargs):
+    """Запоминает прежний аватар редактируемого профиля."""
+    instance._previous_avatar = ''
+    instance._avatar_uploaded = is_uploading(instance.avatar)
+    if not instance._state.adding:
+        instance._previous_avatar = (
+            Profile.objects
+            .filter(pk=instance.pk)
+            .values_list('avatar', flat=True)
+            .first()
+        ) or ''
+
+
+@receiver(post_save, sender=Profile)
+def release_replaced_avatar(sender, instance, **kwargs):
+    """Освобождает прежний аватар, если его заменили или загрузили
+    заново.
+    """
+    previous = getattr(instance, '_previous_avatar', '')
+    uploaded = getattr(instance, '_avatar_uploaded', False)
+    if previous and (uploaded or previous != instance.avatar.name):
+        release_on_commit(instance.avatar, previous)
+
+
+@receiver(post_delete, sender=Profile)
+def release_deleted_avatar(sender, instance, **kwargs):
+    """Освобождает аватар удалённого профиля."""
+    if instance.avatar:
+        release_on_commit(instance.avatar, instance.avatar.name)
+
+
+@receiver(post_migrate)
+def restore_search_index(sender, using, **kwargs):
+    """Восстанавливает триггеры поиска, если миграция пересоздала
+    таблицу постов.
+    """
+    if sender.name == 'posts':
+        install_search_index(connections[using])
@@ -0,0 +1,170 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..api import COMMENTS_ON_PAGE
+from ..caching import INDEX_FEED, get_feed_version, group_feed, profile_feed
+from ..models import Comment, Group, Post, User
+
+
+class PostsApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            for i in range(12)
+        ])
+        cls.post = Post.objects.create(
+            text='Последний пост',
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_paginate_by_cursor(self):
+        """Ленты API отдают все посты по курсорам."""
+        expected = list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'id', flat=True
+            )
+        )
+        feeds = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_profile', args=(self.user.username,)),
+        )
+        for url in feeds:
+            with self.subTest(url=url):
+                data = self.client.get(url).json()
+                seen = [post['id'] for post in data['results']]
+                self.assertIsNone(data['previous'])
+                data = self.client.get(url, {'cursor': data['next']}).json()
+                seen += [post['id'] for post in data['results']]
+                self.assertIsNone(data['next'])
+                self.assertEqual(seen, expected)
+
+    def test_post_record(self):
+        """Запись поста содержит автора, группу и комментарии."""
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Комментарий'
+        )
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=(self.post.id,))
+        )
+        data = response.json()
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['author'], self.user.username)
+        self.assertEqual(data['group'], self.group.slug)
+        self.assertEqual(data['comments_count'], 1)
+        self.assertEqual(data['comments'][0]['text'], 'Комментарий')
+
+    def test_not_modified(self):
+        """Неизменившаяся лента отдаёт 304 без запросов к базе."""
+        url = reverse('posts:api_index')
+        response = self.client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            url, {'cursor': 'other'}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_changes_invalidate_etag(self):
+        """Изменение поста или комментария меняет ETag."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_post_detail', args=(self.post.id,)),
+        )
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Изменённый текст'
+        post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+        url = reverse('posts:api_post_detail', args=(self.post.id,))
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(post=post, author=self.user, text='Новый')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['comments']), 1)
+
+    def test_comment_invalidates_lists(self):
+        """Новый комментарий меняет ETag лент со счётчиком комментариев."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=(self.group.slug,)),
+            reverse('posts:api_profile', args=(self.user.username,)),
+        )
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        Comment.objects.create(post=self.post, author=self.user, text='Новый')
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    response.json()['results'][0]['comments_count'], 1
+                )
+
+    def test_comment_keeps_page_caches(self):
+        """Комментарий не меняет версии лент, по которым кэшируются
+        HTML-страницы и RSS/Atom.
+        """
+        feeds = (
+            INDEX_FEED,
+            group_feed(self.group.slug),
+            profile_feed(self.user.username),
+        )
+        versions = [get_feed_version(feed) for feed in feeds]
+        Comment.objects.create(post=self.post, author=self.user, text='Новый')
+        self.assertEqual(
+            [get_feed_version(feed) for feed in feeds], versions
+        )
+
+    def test_comments_paginate_by_cursor(self):
+        """Комментарии поста отдаются страницами по курсору."""
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.user, text=f'Комментарий {i}')
+            for i in range(COMMENTS_ON_PAGE + 1)
+        ])
+        url = reverse('posts:api_post_detail', args=(self.post.id,))
+        data = self.client.get(url).json()
+        self.assertEqual(len(data['comments']), COMMENTS_ON_PAGE)
+        self.assertIsNone(data['previous'])
+        data = self.client.get(url, {'cursor': data['next']}).json()
+        self.assertEqual(len(data['comments']), 1)
+        self.assertIsNone(data['next'])
+        self.assertEqual(
+            data['comments'][0]['text'], f'Комментарий {COMMENTS_ON_PAGE}'
+        )
+
+    def test_missing_objects(self):
+        """Несуществующие группа, автор и пост — 404."""
+        urls = (
+            reverse('posts:api_group_list', args=('missing',)),
+            reverse('posts:api_profile', args=('missing',)),
+            reverse('posts:api_post_detail', args=(0,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..benchmark import BENCHMARK_ROUTES, PUBLIC, percentile
+from ..models import Comment, Follow, Post, Profile, User
+
+
+class BenchmarkTests(TestCase):
+    def test_seed(self):
+        """seed_benchmark создаёт связные данные и счётчики."""
+        call_command(
+            'seed_benchmark', users=30, groups=3, posts=200, comments=50,
+            stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Profile.objects.count(), 30)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertTrue(Follow.objects.exists())
+        profile = Profile.objects.order_by('-posts_count').first()
+        self.assertEqual(
+            profile.posts_count,
+            Post.objects.filter(author_id=profile.user_id).count(),
+        )
+
+    def run_benchmark(self, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.json')
+            call_command(
+                'run_benchmark', repeat=2, output=path, stdout=StringIO(),
+                **options
+            )
+            with open(path, encoding='utf-8') as output:
+                return json.load(output)
+
+    def test_run_covers_read_only_urls(self):
+        """run_benchmark замеряет маршруты BENCHMARK_ROUTES с ответом 200
+        и не меняет данные.
+        """
+        call_command(
+            'seed_benchmark', users=10, groups=2, posts=30, comments=10,
+            stdout=StringIO(),
+        )
+        counts = (
+            Post.objects.count(),
+            Comment.objects.count(),
+            Follow.objects.count(),
+        )
+        report = self.run_benchmark()
+        self.assertEqual(set(report['views']), set(BENCHMARK_ROUTES))
+        for name, result in report['views'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['status'], 200)
+                self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+        self.assertEqual(
+            (
+                Post.objects.count(),
+                Comment.objects.count(),
+                Follow.objects.count(),
+            ),
+            counts,
+        )
+        report = self.run_benchmark(anonymous=True)
+        self.assertEqual(
+            set(report['views']),
+            {name for name, role in BENCHMARK_ROUTES.items()
+             if role == PUBLIC},
+        )
+
+    def test_percentile(self):
+        """Перцентиль по ближайшему рангу."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile([7], 0.95), 7)
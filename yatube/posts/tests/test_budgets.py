@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class QueryBudgetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.author = User.objects.create(
+            username='author',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for i in range(15):
+            post = Post.objects.create(
+                text=f'Тестовый пост {i}',
+                author=cls.author if i % 2 else cls.user,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=post,
+                author=cls.user if i % 2 else cls.author,
+                text='Комментарий',
+            )
+        cls.post = post
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_views_within_budget(self):
+        """Страницы укладываются в бюджет запросов QUERY_BUDGETS."""
+        urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=(self.group.slug,)
+            ),
+            'posts:profile': reverse(
+                'posts:profile', args=(self.author.username,)
+            ),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=(self.post.id,)
+            ),
+            'posts:post_comments': reverse(
+                'posts:post_comments', args=(self.post.id,)
+            ),
+            'posts:search': reverse('posts:search') + '?q=пост',
+            'posts:follow_index': reverse('posts:follow_index'),
+            'posts:api_index': reverse('posts:api_index'),
+            'posts:api_group_list': reverse(
+                'posts:api_group_list', args=(self.group.slug,)
+            ),
+            'posts:api_profile': reverse(
+                'posts:api_profile', args=(self.author.username,)
+            ),
+            'posts:api_post_detail': reverse(
+                'posts:api_post_detail', args=(self.post.id,)
+            ),
+            'posts:feed_index_rss': reverse('posts:feed_index_rss'),
+            'posts:feed_index_atom': reverse('posts:feed_index_atom'),
+            'posts:feed_group_rss': reverse(
+                'posts:feed_group_rss', args=(self.group.slug,)
+            ),
+            'posts:feed_group_atom': reverse(
+                'posts:feed_group_atom', args=(self.group.slug,)
+            ),
+            'posts:feed_profile_rss': reverse(
+                'posts:feed_profile_rss', args=(self.author.username,)
+            ),
+            'posts:feed_profile_atom': reverse(
+                'posts:feed_profile_atom', args=(self.author.username,)
+            ),
+        }
+        self.assertEqual(set(urls), set(settings.QUERY_BUDGETS))
+        for client in (self.authorized_client, self.client):
+            for name, url in urls.items():
+                with self.subTest(name=name, client=client):
+                    response = client.get(url)
+                    self.assertIn(response.status_code, (200, 302))
@@ -0,0 +1,75 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+from ..views import COMMENTS_ON_PAGE
+
+
+class PostCommentsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+        )
+        cls.commentators = [
+            User.objects.create(username=f'commentator_{i}')
+            for i in range(3)
+        ]
+        Comment.objects.bulk_create([
+            Comment(
+                post=cls.post,
+                author=cls.commentators[i % 3],
+                text=f'Комментарий {i}',
+            )
+            for i in range(COMMENTS_ON_PAGE + 5)
+        ])
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def test_first_page(self):
+        """Страница поста показывает первую порцию старых комментариев."""
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=(self.post.id,))
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_ON_PAGE)
+        self.assertEqual(
+            list(comments),
+            list(Comment.objects.order_by('created', 'pk')[:COMMENTS_ON_PAGE]),
+        )
+        self.assertTrue(comments.has_next())
+        self.assertContains(
+            response, reverse('posts:post_comments', args=(self.post.id,))
+        )
+
+    def test_fragment_continues_from_cursor(self):
+        """Фрагмент по курсору отдаёт оставшиеся комментарии."""
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.id,))
+        )
+        cursor = response.context['comments'].next_cursor
+        url = reverse('posts:post_comments', args=(self.post.id,))
+        response = self.client.get(url, {'cursor': cursor})
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        comments = response.context['comments']
+        self.assertEqual(len(comments), 5)
+        self.assertFalse(comments.has_next())
+        self.assertContains(response, 'Комментарий 24')
+        self.assertNotContains(response, 'comments-more')
+
+    def test_authors_are_preloaded(self):
+        """Авторы комментариев загружаются вместе с комментариями."""
+        url = reverse('posts:post_comments', args=(self.post.id,))
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_missing_post(self):
+        """Комментарии несуществующего поста — 404."""
+        response = self.client.get(reverse('posts:post_comments', args=(0,)))
+        self.assertEqual(response.status_code, 404)
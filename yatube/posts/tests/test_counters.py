@@ -0,0 +1,93 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, Profile, User
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(
+            username='author',
+        )
+        cls.follower = User.objects.create(
+            username='follower',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='slug_2',
+            description='Тестовое описание 2',
+        )
+
+    def assertCounters(self, model, pk, **expected):
+        counters = model.objects.values(*expected).get(pk=pk)
+        self.assertEqual(counters, expected)
+
+    def test_post_counters(self):
+        """Счётчики постов автора и групп следуют за постами."""
+        post = Post.objects.create(
+            text='Тестовый пост',
+            author=self.author,
+            group=self.group,
+        )
+        self.assertCounters(Profile, self.author.settings.pk, posts_count=1)
+        self.assertCounters(Group, self.group.pk, posts_count=1)
+
+        post.group = self.group_2
+        post.save()
+        self.assertCounters(Group, self.group.pk, posts_count=0)
+        self.assertCounters(Group, self.group_2.pk, posts_count=1)
+
+        post.delete()
+        self.assertCounters(Profile, self.author.settings.pk, posts_count=0)
+        self.assertCounters(Group, self.group_2.pk, posts_count=0)
+
+    def test_comment_and_follow_counters(self):
+        """Счётчики комментариев и подписок следуют за объектами."""
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.follower, text='Комментарий'
+        )
+        self.assertCounters(Post, post.pk, comments_count=1)
+        comment.delete()
+        self.assertCounters(Post, post.pk, comments_count=0)
+
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.assertCounters(
+            Profile, self.author.settings.pk,
+            followers_count=1, following_count=0,
+        )
+        self.assertCounters(Profile, self.follower.settings.pk,
+                            following_count=1)
+        Follow.objects.filter(user=self.follower).delete()
+        self.assertCounters(Profile, self.author.settings.pk,
+                            followers_count=0)
+
+    def test_recount_command(self):
+        """Команда recount_counters чинит счётчики после bulk_create."""
+        Post.objects.bulk_create([
+            Post(text=f'Пост {i}', author=self.author, group=self.group)
+            for i in range(3)
+        ])
+        self.assertCounters(Group, self.group.pk, posts_count=0)
+        call_command('recount_counters', stdout=open('/dev/null', 'w'))
+        self.assertCounters(Group, self.group.pk, posts_count=3)
+        self.assertCounters(Profile, self.author.settings.pk, posts_count=3)
+
+    def test_post_detail_does_not_count(self):
+        """Страница поста показывает счётчик без COUNT-запросов."""
+        post = Post.objects.create(text='Тестовый пост', author=self.author)
+        with self.assertNumQueries(2) as queries:
+            response = self.client.get(
+                reverse('posts:post_detail', args=(post.id,))
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+        self.assertContains(response, 'Всего постов автора: <span>1</span>')
@@ -0,0 +1,89 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import EXCERPT_LENGTH, Follow, Group, Post, User
+
+LONG_TEXT = 'Длинный текст поста. ' * 100
+
+
+class PostExcerptTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.reader = User.objects.create(
+            username='reader',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        cls.post = Post.objects.create(
+            text=LONG_TEXT,
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_excerpt_on_save(self):
+        """Анонс заполняется и обновляется при сохранении."""
+        post = Post.objects.create(text=LONG_TEXT, author=self.user)
+        self.assertEqual(len(post.excerpt), EXCERPT_LENGTH)
+        self.assertTrue(post.excerpt.endswith('…'))
+        post.text = 'Короткий текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Короткий текст')
+
+    def test_backfill_command(self):
+        """Команда заполняет анонсы постов, изменённых в обход save(),
+        и сбрасывает кэш лент и карточек.
+        """
+        Post.objects.update(excerpt='')
+        client = Client()
+        url = reverse('posts:index')
+        self.assertNotContains(client.get(url), self.post.excerpt)
+        call_command('backfill_excerpts', batch_size=1, stdout=StringIO())
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).excerpt, self.post.excerpt
+        )
+        self.assertContains(client.get(url), self.post.excerpt)
+
+    def test_migration_fills_excerpts(self):
+        """Миграция 0030 заполняет анонсы существующих постов."""
+        migration = import_module('posts.migrations.0030_post_excerpt')
+        Post.objects.update(excerpt='')
+        migration.backfill_excerpts(apps, connection.schema_editor())
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).excerpt, self.post.excerpt
+        )
+
+    def test_lists_defer_text(self):
+        """Ленты не загружают полный текст постов."""
+        client = Client()
+        client.force_login(self.reader)
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                post = response.context['page_obj'][0]
+                self.assertIn('text', post.get_deferred_fields())
+                self.assertContains(response, self.post.excerpt)
+                self.assertNotContains(response, LONG_TEXT)
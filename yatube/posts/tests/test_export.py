@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..export import export_lines
+from ..models import Comment, Group, Post, User
+
+
+class PostsExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.other_user = User.objects.create(
+            username='other',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            text='Чужой пост',
+            author=cls.other_user,
+        )
+        Comment.objects.create(
+            post=cls.other_post,
+            author=cls.user,
+            text='Комментарий',
+        )
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.user)
+        cls.other_client = Client()
+        cls.other_client.force_login(cls.other_user)
+
+    def test_author_export(self):
+        """Выгрузка автора содержит только его посты и комментарии."""
+        records = [json.loads(line) for line in export_lines(self.user)]
+        self.assertEqual(
+            [(record['type'], record['id']) for record in records],
+            [('post', self.post.id), ('comment', records[1]['id'])],
+        )
+        self.assertEqual(records[0]['author'], self.user.username)
+        self.assertEqual(records[0]['group'], self.group.slug)
+        self.assertEqual(records[1]['post'], self.other_post.id)
+
+    def test_full_export_starts_with_groups(self):
+        """Полная выгрузка начинается с групп."""
+        types = [json.loads(line)['type'] for line in export_lines()]
+        self.assertEqual(types, ['group', 'post', 'post', 'comment'])
+
+    def test_export_view_streams(self):
+        """Выгрузка отдаётся потоком и доступна только автору."""
+        url = reverse('posts:profile_export', args=(self.user.username,))
+        response = self.author_client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        response = self.other_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_command(self):
+        """Команда export_posts пишет выгрузку в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'dump.ndjson')
+            call_command('export_posts', output=path, chunk_size=1)
+            with open(path, encoding='utf-8') as dump:
+                self.assertEqual(len(dump.readlines()), 4)
@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class SyndicationFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.other = User.objects.create(
+            username='other',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Пост в группе',
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.other_post = Post.objects.create(
+            text='Пост без группы',
+            author=cls.other,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_content(self):
+        """Ленты содержат только посты своей группы или автора."""
+        feeds = (
+            ('posts:feed_index_rss', (), 'application/rss+xml',
+             [self.post, self.other_post]),
+            ('posts:feed_index_atom', (), 'application/atom+xml',
+             [self.post, self.other_post]),
+            ('posts:feed_group_rss', (self.group.slug,),
+             'application/rss+xml', [self.post]),
+            ('posts:feed_group_atom', (self.group.slug,),
+             'application/atom+xml', [self.post]),
+            ('posts:feed_profile_rss', (self.other.username,),
+             'application/rss+xml', [self.other_post]),
+            ('posts:feed_profile_atom', (self.other.username,),
+             'application/atom+xml', [self.other_post]),
+        )
+        for name, args, content_type, posts in feeds:
+            with self.subTest(name=name):
+                response = self.client.get(reverse(name, args=args))
+                self.assertTrue(
+                    response['Content-Type'].startswith(content_type)
+                )
+                for post in Post.objects.all():
+                    url = reverse('posts:post_detail', args=(post.id,))
+                    if post in posts:
+                        self.assertContains(response, url)
+                    else:
+                        self.assertNotContains(response, url)
+
+    def test_unknown_group(self):
+        """Лента несуществующей группы — 404."""
+        response = self.client.get(
+            reverse('posts:feed_group_rss', args=('unknown',))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        """Неизменившаяся лента — 304 без запросов к базе."""
+        url = reverse('posts:feed_group_atom', args=(self.group.slug,))
+        response = self.client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(
+                url,
+                HTTP_IF_NONE_MATCH=response['ETag'],
+            )
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(not_modified.status_code, 304)
+        modified = self.client.get(
+            url,
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(modified.status_code, 304)
+
+    def test_new_post_updates_feed(self):
+        """Новый пост группы сразу попадает в ленту."""
+        url = reverse('posts:feed_group_rss', args=(self.group.slug,))
+        response = self.client.get(url)
+        post = Post.objects.create(
+            text='Новый пост',
+            author=self.other,
+            group=self.group,
+        )
+        updated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(updated.status_code, 200)
+        self.assertContains(
+            updated, reverse('posts:post_detail', args=(post.id,))
+        )
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..follows import follow_states, get_followed_ids
+from ..models import Follow, Post, User
+
+
+class FollowSetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(
+            username='author',
+        )
+        cls.other = User.objects.create(
+            username='other',
+        )
+        cls.reader = User.objects.create(
+            username='reader',
+        )
+        Follow.objects.create(user=cls.other, author=cls.author)
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_follow_set_cached(self):
+        """Подписки читаются из базы один раз, затем из кэша."""
+        self.assertEqual(get_followed_ids(self.other), {self.author.id})
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_followed_ids(User(id=self.other.id)), {self.author.id}
+            )
+
+    def test_follow_and_unfollow_reset_cache(self):
+        """Подписка и отписка сбрасывают кэш подписок."""
+        self.assertEqual(get_followed_ids(self.reader), set())
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        reader = User.objects.get(id=self.reader.id)
+        self.assertEqual(get_followed_ids(reader), {self.author.id})
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        reader = User.objects.get(id=self.reader.id)
+        self.assertEqual(get_followed_ids(reader), set())
+
+    def test_follow_states(self):
+        """Пакетная проверка подписок без своих постов и анонимов."""
+        self.assertEqual(
+            follow_states(self.other, [self.author.id, self.reader.id,
+                                       self.other.id]),
+            {self.author.id: True, self.reader.id: False},
+        )
+        self.assertEqual(
+            follow_states(AnonymousUser(), [self.author.id]), {}
+        )
+
+    def test_profile_following(self):
+        """На профиле подписка считается для текущего пользователя."""
+        response = self.reader_client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertFalse(response.context['following'])
+        self.assertContains(
+            response,
+            reverse('posts:profile_follow', args=(self.author.username,)),
+        )
+
+    def test_card_follow_state(self):
+        """Карточка поста показывает подписку на автора."""
+        follow_url = reverse(
+            'posts:profile_follow', args=(self.author.username,)
+        )
+        unfollow_url = reverse(
+            'posts:profile_unfollow', args=(self.author.username,)
+        )
+        response = self.reader_client.get(reverse('posts:index'))
+        self.assertContains(response, follow_url)
+        self.assertNotContains(response, unfollow_url)
+        self.reader_client.get(follow_url)
+        response = self.reader_client.get(reverse('posts:index'))
+        self.assertContains(response, unfollow_url)
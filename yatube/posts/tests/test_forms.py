@@ -1,12 +1,16 @@
+import hashlib
 import shutil
 import tempfile
+from io import BytesIO
 
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 
-from ..models import Group, Post, User
+from ..images import AVATAR_SIZE
+from ..models import Group, Post, Profile, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -117,4 +121,39 @@ class PostFormTests(TestCase):
         self.post_create(reverse('posts:post_create'),
                          self.create_post_with_image_form_data)
         post = Post.objects.first()
-        self.assertEqual(f'posts/{self.uploaded}', post.image)
+        digest = hashlib.sha256(self.image).hexdigest()
+        self.assertEqual(f'blobs/{digest[:2]}/{digest}.gif', post.image)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ProfileFormTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_large_avatar_normalized(self):
+        """Загруженный через настройки аватар хранится уменьшенным JPEG."""
+        output = BytesIO()
+        Image.new('RGB', (3000, 3000), (200, 30, 30)).save(output, 'PNG')
+        url = reverse('posts:profile_settings', args=(self.user.username,))
+        response = self.authorized_client.post(url, {
+            'avatar': SimpleUploadedFile('avatar.png', output.getvalue()),
+        })
+        self.assertRedirects(response, url)
+        avatar = Profile.objects.get(user=self.user).avatar
+        self.assertTrue(avatar.name.endswith('.jpg'))
+        with Image.open(avatar.path) as stored:
+            self.assertEqual(stored.format, 'JPEG')
+            self.assertEqual(stored.size, AVATAR_SIZE)
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.test import TestCase
+
+from ..models import Group, Post, User
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def render_card(self, avatar='default_avatar.png'):
+        post = Post.objects.select_related('author', 'group').get(
+            pk=self.post.pk
+        )
+        return render_to_string('includes/post.html', {
+            'post': post,
+            'avatars': {post.author_id: avatar},
+            'show_author': True,
+        })
+
+    def test_card_is_cached(self):
+        """Повторная отрисовка карточки берётся из кэша."""
+        first = self.render_card()
+        Post.objects.filter(pk=self.post.pk).update(text='Изменено в обход')
+        self.assertEqual(self.render_card(), first)
+
+    def test_card_key_changes(self):
+        """Изменение поста, группы или аватара меняет карточку."""
+        first = self.render_card()
+
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Отредактированный пост'
+        post.save()
+        edited = self.render_card()
+        self.assertNotEqual(edited, first)
+        self.assertIn('Отредактированный пост', edited)
+
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название группы'
+        group.save()
+        self.assertIn('Новое название группы', self.render_card())
+
+        self.assertNotEqual(
+            self.render_card(avatar='posts/avatar/new.png'),
+            self.render_card(),
+        )
@@ -0,0 +1,76 @@
+from io import BytesIO
+from unittest import skipUnless
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image, features
+
+from ..forms import PostForm
+from ..images import normalize_image
+
+
+def make_upload(name, size, image_format, mode='RGB', **options):
+    output = BytesIO()
+    color = (200, 30, 30, 128) if mode == 'RGBA' else (200, 30, 30)
+    Image.new(mode, size, color).save(output, image_format, **options)
+    return SimpleUploadedFile(name, output.getvalue())
+
+
+def open_result(upload):
+    upload.seek(0)
+    return Image.open(BytesIO(upload.read()))
+
+
+class NormalizeImageTests(TestCase):
+    def test_large_image_resized_and_stripped(self):
+        """Большой снимок уменьшается, теряет EXIF и становится JPEG."""
+        exif = Image.Exif()
+        exif[0x010F] = 'Камера'
+        upload = make_upload(
+            'photo.png', (3000, 1500), 'PNG', exif=exif.tobytes()
+        )
+        result = open_result(normalize_image(upload, (1000, 1000)))
+        self.assertEqual(result.format, 'JPEG')
+        self.assertEqual(result.size, (1000, 500))
+        self.assertNotIn('exif', result.info)
+        self.assertTrue(result.info.get('progressive'))
+
+    def test_orientation_applied(self):
+        """Картинка поворачивается по тегу Orientation."""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        upload = make_upload(
+            'photo.jpg', (40, 20), 'JPEG', exif=exif.tobytes()
+        )
+        normalized = normalize_image(upload)
+        self.assertEqual(normalized.name, 'photo.jpg')
+        self.assertEqual(open_result(normalized).size, (20, 40))
+
+    def test_transparency_flattened(self):
+        """Прозрачность JPEG заменяется белым фоном."""
+        upload = make_upload('logo.png', (3000, 10), 'PNG', mode='RGBA')
+        result = open_result(normalize_image(upload, (100, 100)))
+        self.assertEqual(result.mode, 'RGB')
+
+    @skipUnless(features.check('webp'), 'Pillow собран без WebP')
+    @override_settings(IMAGE_FORMAT='webp', IMAGE_QUALITY=60)
+    def test_webp(self):
+        """Формат результата задаётся настройкой IMAGE_FORMAT."""
+        upload = make_upload('logo.png', (3000, 10), 'PNG', mode='RGBA')
+        normalized = normalize_image(upload, (100, 100))
+        self.assertEqual(normalized.name, 'logo.webp')
+        self.assertEqual(open_result(normalized).mode, 'RGBA')
+
+    def test_small_clean_image_kept(self):
+        """Небольшая картинка без метаданных сохраняется как есть."""
+        upload = make_upload('icon.gif', (10, 10), 'GIF')
+        self.assertIs(normalize_image(upload), upload)
+
+    def test_post_form(self):
+        """PostForm нормализует загруженную картинку."""
+        form = PostForm(
+            data={'text': 'Пост с картинкой'},
+            files={'image': make_upload('photo.png', (4000, 100), 'PNG')},
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.cleaned_data['image'].name, 'photo.jpg')
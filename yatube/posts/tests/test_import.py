@@ -0,0 +1,154 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..export import export_lines
+from ..models import (Comment, Follow, Group, ImportedComment, ImportedPost,
+                      Post, Profile, TimelineEntry, User)
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.follower = User.objects.create(
+            username='follower',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'dump.ndjson')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_dump(self, records):
+        with open(self.path, 'w', encoding='utf-8') as dump:
+            for record in records:
+                dump.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def records(self):
+        yield {
+            'type': 'group',
+            'slug': 'imported',
+            'title': 'Импортированная группа',
+            'description': 'Описание',
+        }
+        for i in range(1, 6):
+            yield {
+                'type': 'post',
+                'id': 100 + i,
+                'author': 'username' if i % 2 else 'newcomer',
+                'group': 'imported',
+                'text': f'Старый пост {i}',
+                'pub_date': f'2015-01-0{i}T10:00:00+00:00',
+                'image': '',
+            }
+        yield {
+            'type': 'comment',
+            'id': 500,
+            'post': 101,
+            'author': 'newcomer',
+            'text': 'Старый комментарий',
+            'created': '2015-02-01T10:00:00+00:00',
+        }
+        yield {
+            'type': 'comment',
+            'id': 501,
+            'post': 999,
+            'author': 'newcomer',
+            'text': 'Комментарий к отсутствующему посту',
+            'created': '2015-02-01T10:00:00+00:00',
+        }
+
+    def imported_post(self, source_id):
+        return ImportedPost.objects.get(
+            source='dump.ndjson', source_id=source_id
+        ).post
+
+    def test_import(self):
+        """Загрузка сохраняет даты, создаёт авторов и группы."""
+        self.write_dump(self.records())
+        stdout = StringIO()
+        call_command('import_posts', self.path, batch_size=2, stdout=stdout)
+        post = self.imported_post(101)
+        self.assertEqual(post.pub_date.year, 2015)
+        self.assertEqual(post.group.title, 'Импортированная группа')
+        self.assertEqual(post.comments_count, 1)
+        comment = ImportedComment.objects.get(source_id=500).comment
+        self.assertEqual(comment.created.month, 2)
+        self.assertEqual(comment.post, post)
+        self.assertFalse(ImportedComment.objects.filter(source_id=501))
+        self.assertIn('Записано: 6, пропущено: 1', stdout.getvalue())
+        newcomer = User.objects.get(username='newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(Profile.objects.get(user=newcomer).posts_count, 2)
+        self.assertEqual(Group.objects.get(slug='imported').posts_count, 5)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.follower).count(), 3
+        )
+        self.assertFalse(os.path.exists(f'{self.path}.checkpoint'))
+
+    def test_resume_does_not_duplicate(self):
+        """Повторная загрузка с checkpoint не создаёт дубликатов."""
+        self.write_dump(self.records())
+        with open(f'{self.path}.checkpoint', 'w') as checkpoint:
+            checkpoint.write('0')
+        call_command(
+            'import_posts', self.path, batch_size=2, stdout=StringIO()
+        )
+        with open(self.path, 'rb') as dump:
+            dump.readline()
+            dump.readline()
+            offset = dump.tell()
+        with open(f'{self.path}.checkpoint', 'w') as checkpoint:
+            checkpoint.write(str(offset))
+        call_command(
+            'import_posts', self.path, batch_size=2, stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_colliding_ids(self):
+        """Посты выгрузки с id локальных постов получают новые id, а их
+        комментарии не попадают к локальным постам.
+        """
+        local = Post.objects.create(id=101, text='Локальный', author=self.user)
+        self.write_dump(self.records())
+        stdout = StringIO()
+        call_command('import_posts', self.path, stdout=stdout)
+        post = self.imported_post(101)
+        self.assertNotEqual(post.id, local.id)
+        self.assertEqual(post.text, 'Старый пост 1')
+        self.assertEqual(post.comments.count(), 1)
+        self.assertFalse(local.comments.exists())
+        self.assertEqual(Post.objects.count(), 6)
+        self.assertIn('Записано: 6,', stdout.getvalue())
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.follower).count(), 4
+        )
+
+    def test_export_round_trip(self):
+        """Выгрузка export_posts загружается обратно без потерь."""
+        self.write_dump(self.records())
+        call_command('import_posts', self.path, stdout=StringIO())
+        with open(self.path, 'w', encoding='utf-8') as dump:
+            dump.writelines(export_lines())
+        expected = list(Post.objects.values_list('text', 'pub_date'))
+        Post.objects.all().delete()
+        call_command('import_posts', self.path, stdout=StringIO())
+        self.assertEqual(
+            list(Post.objects.values_list('text', 'pub_date')),
+            expected,
+        )
+        self.assertEqual(Comment.objects.count(), 1)
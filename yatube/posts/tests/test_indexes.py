@@ -0,0 +1,110 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, Profile, User
+
+
+def explain(sql):
+    """План выполнения запроса SQLite одной строкой."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return ' | '.join(str(row[-1]) for row in cursor.fetchall())
+
+
+class FeedIndexesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.follower = User.objects.create(
+            username='follower',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.follower, author=cls.user)
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            author=cls.user,
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post,
+            text='Тестовый комментарий',
+            author=cls.follower,
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+        cache.clear()
+
+    def test_views_use_indexes(self):
+        """Запросы лент выполняются по составным индексам без сортировки
+        во временном B-дереве.
+        """
+        views_indexes = [
+            (reverse('posts:index'), 'post_pub_date_idx'),
+            (
+                reverse('posts:group_list', args=(self.group.slug,)),
+                'post_group_pub_date_idx',
+            ),
+            (
+                reverse('posts:profile', args=(self.user.username,)),
+                'post_author_pub_date_idx',
+            ),
+            (reverse('posts:follow_index'), 'timeline_user_pub_date_idx'),
+            (
+                reverse('posts:post_detail', args=(self.post.id,)),
+                'comment_post_created_idx',
+            ),
+        ]
+        for url, index_name in views_indexes:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    self.follower_client.get(url)
+                plans = [
+                    explain(query['sql'])
+                    for query in queries.captured_queries
+                    if query['sql'].startswith('SELECT')
+                ]
+                feed_plans = [plan for plan in plans if index_name in plan]
+                self.assertTrue(
+                    feed_plans,
+                    f'{url} не использует индекс {index_name}',
+                )
+                for plan in feed_plans:
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_follow_is_unique(self):
+        """Повторная подписка на автора запрещена на уровне базы."""
+        with self.assertRaises(IntegrityError):
+            Follow.objects.create(user=self.follower, author=self.user)
+
+    def test_remove_duplicate_follows(self):
+        """Миграция 0028 сохраняет единственные подписки и пересчитывает
+        счётчики подписчиков.
+        """
+        migration = import_module('posts.migrations.0028_feed_indexes')
+        Profile.objects.update(followers_count=2, following_count=2)
+        migration.remove_duplicate_follows(apps, connection.schema_editor())
+        self.assertTrue(
+            Follow.objects.filter(user=self.follower, author=self.user)
+            .exists()
+        )
+        self.assertEqual(
+            Profile.objects.get(user=self.user).followers_count, 1
+        )
+        self.assertEqual(
+            Profile.objects.get(user=self.follower).following_count, 1
+        )
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..pagination import KeysetPaginator
+
+
+@override_settings(POSTS_KEYSET_PAGINATION=True)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([
+            Post(
+                text=f'Тестовый пост {i}',
+                author=cls.user,
+                group=cls.group,
+            )
+            for i in range(23)
+        ])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_follow_cursors(self):
+        """Курсоры обходят ленту без пропусков и повторов."""
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        pages_with_paginator = {
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        }
+        for reverse_name in pages_with_paginator:
+            with self.subTest(reverse_name=reverse_name):
+                seen = []
+                response = self.client.get(reverse_name)
+                page_obj = response.context['page_obj']
+                self.assertFalse(page_obj.has_previous())
+                seen.extend(page_obj)
+                while page_obj.has_next():
+                    response = self.client.get(
+                        reverse_name, {'cursor': page_obj.next_cursor}
+                    )
+                    page_obj = response.context['page_obj']
+                    seen.extend(page_obj)
+                self.assertEqual(seen, expected)
+                self.assertEqual(len(page_obj), 3)
+
+    def test_previous_cursor(self):
+        """Курсор назад возвращает предыдущую страницу."""
+        paginator = KeysetPaginator(Post.objects.all(), 10)
+        first_page = paginator.get_page()
+        second_page = paginator.get_page(first_page.next_cursor)
+        back_page = paginator.get_page(second_page.previous_cursor)
+        self.assertEqual(list(back_page), list(first_page))
+        self.assertTrue(back_page.has_next())
+        self.assertFalse(back_page.has_previous())
+
+    def test_page_does_not_count(self):
+        """Курсорная страница не выполняет COUNT и OFFSET."""
+        paginator = KeysetPaginator(Post.objects.all(), 10)
+        cursor = paginator.get_page().next_cursor
+        with self.assertNumQueries(1) as queries:
+            paginator.get_page(cursor)
+        sql = queries.captured_queries[0]['sql'].upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Некорректный курсор открывает первую страницу."""
+        response = self.client.get(
+            reverse('posts:index'), {'cursor': 'broken'}
+        )
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertFalse(response.context['page_obj'].has_previous())
@@ -0,0 +1,79 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Post, User
+from ..search import PostSearchResults, match_expression
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.post = Post.objects.create(
+            text='Сегодня в Москве солнечно',
+            author=cls.user,
+        )
+        cls.other_post = Post.objects.create(
+            text='Погода в Петербурге: дождь, дождь и снова дождь',
+            author=cls.user,
+        )
+
+    def search(self, query):
+        return list(PostSearchResults(query)[0:10])
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при создании, изменении и удалении."""
+        self.assertEqual(self.search('москве'), [self.post])
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Сегодня в Казани солнечно'
+        post.save()
+        self.assertEqual(self.search('москве'), [])
+        self.assertEqual(self.search('казани'), [post])
+        post.delete()
+        self.assertEqual(self.search('солнечно'), [])
+        Post.objects.bulk_create([
+            Post(text='Пакетный импорт', author=self.user),
+        ])
+        self.assertEqual(len(self.search('пакетный')), 1)
+
+    def test_ranking_and_prefix(self):
+        """Релевантные посты идут первыми, слова ищутся по префиксу."""
+        Post.objects.create(text='Был дождь', author=self.user)
+        results = self.search('дожд')
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0], self.other_post)
+
+    def test_query_syntax_is_escaped(self):
+        """Служебные символы FTS5 в запросе не вызывают ошибок."""
+        self.assertEqual(match_expression('a"b OR'), '"a""b"* "OR"*')
+        self.assertEqual(self.search('"NEAR( * -'), [])
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты постранично."""
+        Post.objects.bulk_create([
+            Post(text=f'Солнечно {i}', author=self.user) for i in range(11)
+        ])
+        url = reverse('posts:search')
+        response = self.client.get(url, {'q': 'солнечно'})
+        self.assertEqual(response.context['page_obj'].paginator.count, 12)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, '?page=2&amp;q=')
+        response = self.client.get(url, {'q': 'солнечно', 'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 2)
+
+    def test_admin_search(self):
+        """Поиск в админке использует полнотекстовый индекс."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'петербурге'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.other_post]
+        )
@@ -0,0 +1,86 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.queue import work
+
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class EagerThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(
+            username='username',
+        )
+        cls.image = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_thumbnails_created_on_save(self):
+        """Миниатюры картинки поста создаются фоновой задачей после
+        сохранения поста.
+        """
+        post = Post.objects.create(
+            text='Тестовый пост',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='eager.gif',
+                content=self.image,
+                content_type='image/gif',
+            ),
+        )
+        self.assertTrue(post.image)
+        work(['thumbnails'], batch_size=10)
+        cache_dir = os.path.join(TEMP_MEDIA_ROOT, 'cache')
+        thumbnails = [
+            name
+            for _, _, files in os.walk(cache_dir)
+            for name in files
+        ]
+        self.assertEqual(len(thumbnails), 1)
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_page_before_job_shows_original(self):
+        """До выполнения задачи страница показывает исходную картинку,
+        не создаёт миниатюр и укладывается в бюджет запросов.
+        """
+        post = Post.objects.create(
+            text='Тестовый пост',
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='deferred.gif',
+                content=self.image,
+                content_type='image/gif',
+            ),
+        )
+        url = reverse('posts:profile', args=(self.user.username,))
+        cache.clear()
+        response = self.client.get(url)
+        self.assertContains(response, f'src="{post.image.url}"')
+        self.assertNotContains(response, '/cache/')
+        work(['thumbnails'], batch_size=10)
+        cache.clear()
+        response = self.client.get(url)
+        self.assertNotContains(response, f'src="{post.image.url}"')
+        self.assertContains(response, '/cache/')
@@ -0,0 +1,60 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(
+            username='author',
+        )
+        cls.follower = User.objects.create(
+            username='follower',
+        )
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту уже опубликованные посты автора."""
+        self.follower_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,))
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.follower,
+                post=self.old_post,
+            ).exists()
+        )
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        new_post = Post.objects.create(
+            text='Пост после подписки',
+            author=self.author,
+        )
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj[0], new_post)
+        self.assertIn(self.old_post, page_obj)
+
+    def test_unfollow_clears_timeline(self):
+        """После отписки посты автора пропадают из ленты."""
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.follower_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.follower).exists()
+        )
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        self.assertNotIn(self.old_post, response.context['page_obj'])
@@ -8,7 +8,7 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 from ..forms import CommentForm, PostForm
-from ..models import Comment, Follow, Group, Post, User
+from ..models import Comment, Follow, Group, Post, Profile, User
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -216,6 +216,28 @@ class PostsViewsTests(TestCase):
         post_author = author_obj.username
         self.assertEqual(post_author, self.user.username)
 
+    def test_page_avatars(self):
+        """Шаблоны лент получают загруженные аватары только авторов
+        постов страницы, аватар по умолчанию пропускается.
+        """
+        pages_with_avatars = {
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        }
+        for reverse_name in pages_with_avatars:
+            with self.subTest(reverse_name=reverse_name):
+                response = self.authorized_client.get(reverse_name)
+                self.assertEqual(response.context['avatars'], {})
+        avatar = 'posts/avatar/avatar.png'
+        Profile.objects.filter(user=self.user).update(avatar=avatar)
+        for reverse_name in pages_with_avatars:
+            with self.subTest(reverse_name=reverse_name):
+                response = self.authorized_client.get(reverse_name)
+                self.assertEqual(
+                    response.context['avatars'], {self.user.id: avatar}
+                )
+
     def test_paginator(self):
         """Шаблоны index, group_list, profile сформированы с правильным
          количеством постов на странице.
@@ -279,27 +301,52 @@ class PostsViewsTests(TestCase):
         self.assertEqual(self.comment.text, comment_obj.text)
 
     def test_index_page_cache(self):
-        """Список постов на странице index хранится в кэше и обновляется раз в
-        20 секунд.
+        """Страница index отдаётся анонимным пользователям из кэша, пока
+        посты ленты не изменились.
         """
-        response_empty_page = self.client.get(reverse('posts:index'))
+        response_first = self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            response_cached = self.client.get(reverse('posts:index'))
+        self.assertEqual(response_cached.content, response_first.content)
         Post.objects.create(
-            text='Тестовый пост',
+            text='Новый пост в ленте',
             author=self.user,
             group=self.group,
             image=self.uploaded,
         )
-        response_page_with_post = self.client.get(reverse('posts:index'))
-        self.assertEqual(
-            response_page_with_post.content,
-            response_empty_page.content
-        )
-        cache.clear()
-        response_after_clear_cache = self.client.get(reverse('posts:index'))
+        response_after_new_post = self.client.get(reverse('posts:index'))
         self.assertNotEqual(
-            response_after_clear_cache.content,
-            response_empty_page.content
+            response_after_new_post.content,
+            response_first.content
+        )
+        self.assertContains(response_after_new_post, 'Новый пост в ленте')
+
+    def test_feed_cache_invalidation(self):
+        """Изменение поста, группы или аватара сбрасывает кэш только
+        затронутых лент.
+        """
+        group_url = reverse('posts:group_list', args=(self.group.slug,))
+        other_group_url = reverse(
+            'posts:group_list', args=(self.group_2.slug,)
         )
+        profile_url = reverse('posts:profile', args=(self.user.username,))
+        urls = (group_url, other_group_url, profile_url)
+        first = {url: self.client.get(url).content for url in urls}
+
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название группы'
+        group.save()
+        profile = Profile.objects.get(user=self.user)
+        profile.avatar = 'posts/avatar/new.png'
+        profile.save()
+
+        self.assertNotEqual(self.client.get(group_url).content,
+                            first[group_url])
+        self.assertNotEqual(self.client.get(profile_url).content,
+                            first[profile_url])
+        with self.assertNumQueries(0):
+            response = self.client.get(other_group_url)
+        self.assertEqual(response.content, first[other_group_url])
 
     def test_check_followers(self):
         """Авторизованный пользователь может подписываться на других
@@ -0,0 +1,91 @@
+"""Генерация миниатюр при сохранении, а не при первой отрисовке.
+
+Размеры и опции должны совпадать с тегами {% thumbnail %} в шаблонах
+includes/post.html и posts/post_detail.html: sorl-thumbnail строит
+имя миниатюры по исходному файлу, геометрии и опциям, поэтому шаблон
+находит заранее созданный файл в key-value store.
+
+DeferredThumbnailBackend (настройка THUMBNAIL_BACKEND) не создаёт
+миниатюры при отрисовке страницы: пока задача generate_thumbnails не
+выполнена, шаблон получает исходную картинку, уже уменьшенную
+normalize_image. Так страница сразу после загрузки не генерирует
+миниатюры и не пишет их в key-value store посреди запроса.
+"""
+import logging
+import threading
+
+import django
+from django.core.files.storage import default_storage
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+POST_IMAGE_THUMBNAILS = (
+    ('1080x720', {'upscale': True}),
+)
+AVATAR_THUMBNAILS = (
+    ('32x32', {'upscale': True, 'padding': True, 'crop': 'center'}),
+)
+THUMBNAIL_SIZES = {
+    'post': POST_IMAGE_THUMBNAILS,
+    'avatar': AVATAR_THUMBNAILS,
+}
+
+
+class ThumbnailDeferred(Exception):
+    """Миниатюры ещё нет, а создавать её в запросе нельзя."""
+
+
+class DeferredThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, создающий миниатюры только внутри
+    generate_thumbnails.
+    """
+
+    def get_thumbnail(self, file_, geometry_string, **options):
+        try:
+            return super().get_thumbnail(file_, geometry_string, **options)
+        except ThumbnailDeferred:
+            return ImageFile(file_)
+
+    def _create_thumbnail(self, *args, **kwargs):
+        if not getattr(_local, 'creating', False):
+            raise ThumbnailDeferred
+        return super()._create_thumbnail(*args, **kwargs)
+
+
+def generate_thumbnails(name, kind):
+    """Создаёт все миниатюры вида kind для файла name из MEDIA."""
+    if not name:
+        return 0
+    created = 0
+    _local.creating = True
+    try:
+        # Хранилище поля модели, а не THUMBNAIL_STORAGE: оно входит в
+        # ключ sorl, и иначе шаблон не нашёл бы созданную миниатюру.
+        source = ImageFile(name, default_storage)
+        for geometry, options in THUMBNAIL_SIZES[kind]:
+            try:
+                get_thumbnail(source, geometry, **options)
+            except (OSError, ValueError):
+                logger.exception('Не удалось создать миниатюру %s для %s',
+                                 geometry, name)
+            else:
+                created += 1
+    finally:
+        _local.creating = False
+    return created
+
+
+def init_worker():
+    """Инициализация Django в процессе пула (нужна для spawn)."""
+    django.setup()
+
+
+def warm_file(task):
+    """Задача пула процессов: (имя файла, вид миниатюр)."""
+    name, kind = task
+    return generate_thumbnails(name, kind)
@@ -0,0 +1,106 @@
+"""Материализованная лента подписок (fan-out on write).
+
+Каждый новый пост раскладывается в ленты подписчиков автора, поэтому
+страница подписок читается одним диапазоном по индексу (user, -pub_date),
+без соединения Follow и Post на каждый запрос.
+"""
+from collections import defaultdict
+
+from .models import Follow, Post, TimelineEntry
+
+FAN_OUT_BATCH_SIZE: int = 500
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост в ленты всех подписчиков автора."""
+    follower_ids = (
+        Follow.objects
+        .filter(author_id=post.author_id)
+        .values_list('user_id', flat=True)
+        .iterator()
+    )
+    entries = (
+        TimelineEntry(
+            user_id=follower_id,
+            post_id=post.id,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for follower_id in follower_ids
+    )
+    _bulk_insert(entries)
+
+
+def fan_out_posts(posts):
+    """Раскладывает пачку постов в ленты подписчиков их авторов.
+
+    Подписчики читаются одним запросом на FAN_OUT_BATCH_SIZE авторов,
+    а не на каждый пост, как в fan_out_post.
+    """
+    by_author = defaultdict(list)
+    for post in posts:
+        by_author[post.author_id].append(post)
+    author_ids = sorted(by_author)
+    for start in range(0, len(author_ids), FAN_OUT_BATCH_SIZE):
+        chunk = author_ids[start:start + FAN_OUT_BATCH_SIZE]
+        follows = (
+            Follow.objects
+            .filter(author_id__in=chunk)
+            .values_list('user_id', 'author_id')
+            .iterator()
+        )
+        entries = (
+            TimelineEntry(
+                user_id=user_id,
+                post_id=post.id,
+                author_id=author_id,
+                pub_date=post.pub_date,
+            )
+            for user_id, author_id in follows
+            for post in by_author[author_id]
+        )
+        _bulk_insert(entries)
+
+
+def backfill_follow(user_id, author_id):
+    """Заполняет ленту подписчика уже опубликованными постами автора."""
+    posts = (
+        Post.objects
+        .filter(author_id=author_id)
+        .values_list('id', 'pub_date')
+        .iterator()
+    )
+    entries = (
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        )
+        for post_id, pub_date in posts
+    )
+    _bulk_insert(entries)
+
+
+def remove_follow(user_id, author_id):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild_timeline():
+    """Полностью пересобирает ленты по текущим подпискам."""
+    TimelineEntry.objects.all().delete()
+    follows = Follow.objects.values_list('user_id', 'author_id').iterator()
+    for user_id, author_id in follows:
+        backfill_follow(user_id, author_id)
+
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= FAN_OUT_BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 
@@ -9,6 +9,12 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_list, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
+    path('search/', views.search, name='search'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
     path(
@@ -32,9 +38,48 @@ urlpatterns = [
         views.profile_settings,
         name='profile_settings'
     ),
+    path(
+        'profile/<str:username>/export/',
+        views.profile_export,
+        name='profile_export'
+    ),
     path(
         'create_group/',
         views.group_create,
         name='group_create'
     ),
+    path('feeds/rss/', feeds.index_rss, name='feed_index_rss'),
+    path('feeds/atom/', feeds.index_atom, name='feed_index_atom'),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.group_rss,
+        name='feed_group_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.group_atom,
+        name='feed_group_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.profile_rss,
+        name='feed_profile_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='feed_profile_atom'
+    ),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path('api/v1/group/<slug:slug>/', api.group_list, name='api_group_list'),
+    path(
+        'api/v1/profile/<str:username>/',
+        api.profile,
+        name='api_profile'
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'
+    ),
 ]
@@ -1,63 +1,108 @@
 from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
 from django.core.paginator import Paginator
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.ratelimit import rate_limit
+
+from .caching import INDEX_FEED, cache_feed_page, group_feed, profile_feed
+from .export import EXPORT_CONTENT_TYPE, export_lines
+from .follows import follow_states, is_following
 from .forms import CommentForm, GroupForm, PostForm, ProfileForm
-from .models import Follow, Group, Post, Profile, User
+from .models import DEFAULT_AVATAR, Follow, Group, Post, Profile, User
+from .pagination import KeysetPaginator, keyset_enabled
+from .search import PostSearchResults, search_available
 
 POSTS_ON_PAGE: int = 10
+COMMENTS_ON_PAGE: int = 20
 
 
 def create_pages(posts, request):
     """Разбиение постов на страницы."""
+    if keyset_enabled():
+        paginator = KeysetPaginator(posts, POSTS_ON_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
     paginator = Paginator(posts, POSTS_ON_PAGE)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def get_comments(post, request):
+    """Порция комментариев поста по курсору, от старых к новым."""
+    comments = post.comments.select_related('author')
+    paginator = KeysetPaginator(
+        comments, COMMENTS_ON_PAGE, field='created', descending=False
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+def get_avatars(page_obj):
+    """Загруженные аватары авторов постов текущей страницы одним
+    запросом. Аватар по умолчанию пропускается: его миниатюры нет, и
+    каждая карточка искала бы её в key-value store sorl.
+    """
+    author_ids = {post.author_id for post in page_obj}
+    avatars = (
+        Profile.objects
+        .filter(user_id__in=author_ids)
+        .exclude(avatar=DEFAULT_AVATAR)
+    )
+    return dict(avatars.values_list('user_id', 'avatar'))
+
+
+def get_follows(request, page_obj):
+    """Подписан ли пользователь на авторов постов текущей страницы."""
+    return follow_states(request.user, {post.author_id for post in page_obj})
+
+
+@cache_feed_page(lambda: INDEX_FEED)
 def index(request):
     """Главная страница."""
     template = 'posts/index.html'
-    settings = Profile.objects.select_related('user')
-    posts = Post.objects.select_related('author', 'group')
+    posts = Post.objects.select_related('author', 'group').defer('text')
     page_obj = create_pages(posts, request)
     context = {
         'page_obj': page_obj,
-        'settings': settings,
+        'avatars': get_avatars(page_obj),
+        'follows': get_follows(request, page_obj),
     }
     return render(request, template, context)
 
 
+@cache_feed_page(group_feed)
 def group_list(request, slug):
     """Страница группы."""
     template = 'posts/group_list.html'
-    settings = Profile.objects.select_related('user')
     group = get_object_or_404(Group, slug=slug)
-    page_obj = create_pages(group.posts.all(), request)
+    posts = group.posts.select_related('author', 'group').defer('text')
+    page_obj = create_pages(posts, request)
     context = {
         'group': group,
         'page_obj': page_obj,
-        'settings': settings,
+        'avatars': get_avatars(page_obj),
+        'follows': get_follows(request, page_obj),
     }
     return render(request, template, context)
 
 
+@cache_feed_page(profile_feed)
 def profile(request, username):
     """Страница пользователя."""
     template = 'posts/profile.html'
-    settings = Profile.objects.select_related('user')
-    author = get_object_or_404(User, username=username)
-    posts_list = author.posts.all()
-    if author.following.filter(author=author).all():
-        following = True
-    else:
-        following = False
+    author = get_object_or_404(
+        User.objects.select_related('settings'),
+        username=username,
+    )
+    posts_list = author.posts.select_related('author', 'group').defer('text')
+    following = is_following(request.user, author.id)
     page_obj = create_pages(posts_list, request)
     context = {
         'author': author,
         'page_obj': page_obj,
         'following': following,
-        'settings': settings,
+        'avatars': get_avatars(page_obj),
+        'follows': get_follows(request, page_obj),
     }
     return render(request, template, context)
 
@@ -65,16 +110,52 @@ def profile(request, username):
 def post_detail(request, post_id):
     """Страница поста."""
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related('author__settings', 'group'),
+        id=post_id,
+    )
     context = {
         'post': post,
         'form': CommentForm(),
-        'comments': comments,
+        'comments': get_comments(post, request),
     }
     return render(request, template, context)
 
 
+def post_comments(request, post_id):
+    """Следующая порция комментариев поста для подгрузки на страницу."""
+    template = 'posts/includes/comments.html'
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    context = {
+        'post': post,
+        'comments': get_comments(post, request),
+    }
+    return render(request, template, context)
+
+
+def search(request):
+    """Страница поиска по текстам постов."""
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    posts = Post.objects.select_related('author', 'group')
+    if not query:
+        results = posts.none()
+    elif search_available():
+        results = PostSearchResults(query, posts)
+    else:
+        results = posts.filter(text__icontains=query)
+    paginator = Paginator(results, POSTS_ON_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'avatars': get_avatars(page_obj),
+        'follows': get_follows(request, page_obj),
+    }
+    return render(request, template, context)
+
+
+@rate_limit('posts:post_create')
 @login_required
 def post_create(request):
     """Страница создания поста."""
@@ -110,6 +191,7 @@ def post_edit(request, post_id):
     return render(request, template, context)
 
 
+@rate_limit('posts:add_comment')
 @login_required
 def add_comment(request, post_id):
     """Добавление комментария к посту."""
@@ -127,17 +209,23 @@ def add_comment(request, post_id):
 def follow_index(request):
     """Страница подписок."""
     template = 'posts/follow.html'
-    settings = Profile.objects.select_related('user')
-    user = request.user
-    posts = Post.objects.filter(author__following__user=user)
+    posts = (
+        Post.objects
+        .filter(timeline__user=request.user)
+        .select_related('author', 'group')
+        .defer('text')
+        .order_by('-timeline__pub_date')
+    )
     page_obj = create_pages(posts, request)
     context = {
         'page_obj': page_obj,
-        'settings': settings,
+        'avatars': get_avatars(page_obj),
+        'follows': get_follows(request, page_obj),
     }
     return render(request, template, context)
 
 
+@rate_limit('posts:profile_follow', methods=('GET', 'POST'))
 @login_required
 def profile_follow(request, username):
     """Подписка на автора."""
@@ -170,16 +258,31 @@ def profile_settings(request, username):
             instance=settings,
         )
         if form.is_valid():
-            form = form.save()
-            form.avatar = request.FILES.get(
-                'avatar',
-                default='default_avatar.png',
-            )
             form.save()
             return redirect('posts:profile_settings', username=username)
     return render(request, template, {'settings': settings})
 
 
+@login_required
+def profile_export(request, username):
+    """Выгрузка постов и комментариев автора в NDJSON.
+
+    Доступна самому автору и персоналу сайта.
+    """
+    author = get_object_or_404(User, username=username)
+    if request.user != author and not request.user.is_staff:
+        raise PermissionDenied
+    response = StreamingHttpResponse(
+        export_lines(author),
+        content_type=EXPORT_CONTENT_TYPE,
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{author.username}.ndjson"'
+    )
+    return response
+
+
+@rate_limit('posts:group_create')
 @login_required
 def group_create(request):
     """Страница создания группы."""
@@ -1,6 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
+
+from .jobs import send_emails
 
 User = get_user_model()
 
@@ -12,3 +15,23 @@ class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email',)
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Форма сброса пароля, отправляющая письмо через очередь задач."""
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        subject = loader.render_to_string(subject_template_name, context)
+        message = {
+            'subject': ''.join(subject.splitlines()),
+            'body': loader.render_to_string(email_template_name, context),
+            'from_email': from_email,
+            'to': [to_email],
+        }
+        if html_email_template_name is not None:
+            message['html'] = loader.render_to_string(
+                html_email_template_name, context
+            )
+        send_emails.delay(**message)
@@ -0,0 +1,20 @@
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from core.queue import job
+
+
+@job(queue='mail', batch=True)
+def send_emails(messages):
+    """Отправка писем пачкой через одно соединение с почтовым сервером."""
+    emails = []
+    for message in messages:
+        email = EmailMultiAlternatives(
+            message['subject'],
+            message['body'],
+            message['from_email'],
+            message['to'],
+        )
+        if message.get('html'):
+            email.attach_alternative(message['html'], 'text/html')
+        emails.append(email)
+    get_connection().send_messages(emails)
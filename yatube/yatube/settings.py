@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -46,10 +47,11 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,7 +59,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
@@ -89,9 +92,49 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# PRAGMA statements run on every new SQLite connection (core.sqlite). WAL
+# lets readers proceed while a writer commits; compare the profiles with
+# `manage.py benchmark_sqlite`.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+# Read replicas of the default database: comma-separated SQLite files in
+# YATUBE_DB_REPLICAS, e.g. YATUBE_DB_REPLICAS=replica.sqlite3. Locally the
+# files are refreshed from the primary with `manage.py sync_replicas`.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.environ.get('YATUBE_DB_REPLICAS', '').split(',')), 1
+):
+    DATABASE_REPLICAS.append(f'replica{number}')
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, path.strip()),
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Views whose safe requests read from replicas (core.middleware), and the
+# cookie that pins a user to the primary for a while after a write.
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+)
+REPLICA_PIN_COOKIE = 'use_primary'
+REPLICA_PIN_SECONDS = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -143,6 +186,20 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Uploads are stored once per unique content under blobs/ and reference
+# counted (core.storage). Thumbnails keep sorl's own names, so they go to
+# the plain file system storage.
+DEFAULT_FILE_STORAGE = 'core.storage.ContentAddressedStorage'
+THUMBNAIL_STORAGE = 'django.core.files.storage.FileSystemStorage'
+# Thumbnails are created by the generate_thumbnails job only; until it runs,
+# pages show the (already resized) original image.
+THUMBNAIL_BACKEND = 'posts.thumbnails.DeferredThumbnailBackend'
+
+# Uploaded post images and avatars are resized, stripped of metadata and
+# re-encoded (posts.images) unless they are small, clean and fit already.
+IMAGE_FORMAT = 'JPEG'  # or 'WEBP'
+IMAGE_QUALITY = 82
+IMAGE_KEEP_BYTES = 256 * 1024
 
 CACHES = {
     'default': {
@@ -150,6 +207,85 @@ CACHES = {
     }
 }
 
+# Keyset pagination of post feeds: no COUNT(*) and no OFFSET, pages are
+# addressed by opaque ?cursor= values instead of ?page= numbers.
+POSTS_KEYSET_PAGINATION = False
+
+# Rendered pages of the public feeds served to anonymous users, seconds.
+# Pages are also dropped as soon as a post, group or avatar changes.
+FEED_CACHE_TIMEOUT = 20
+# RSS/Atom documents (posts.feeds), seconds. They are keyed by the feed
+# version, so a new post in the feed replaces them right away.
+SYNDICATION_CACHE_TIMEOUT = 24 * 60 * 60
+# Cached set of followed author ids per user (posts.follows), seconds. The
+# set is dropped whenever the user follows or unfollows someone.
+FOLLOW_SET_TIMEOUT = 60 * 60
+
+# Local database-backed job queue (core.queue), processed by
+# `manage.py run_jobs`. `concurrency` limits jobs of a queue running at once.
+# Finished jobs are deleted JOB_KEEP_DONE seconds after their run time.
+JOB_QUEUES = {
+    'default': {'concurrency': 4},
+    'thumbnails': {'concurrency': 4},
+    'mail': {'concurrency': 20},
+}
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 600
+JOB_KEEP_DONE = 24 * 3600
+JOBS_RUN_EAGERLY = False
+
+# Per-view SQL query budgets checked by core.middleware.QueryBudgetMiddleware,
+# keyed by namespaced view name. Exceeding a budget is logged, or raises
+# QueryBudgetExceeded when QUERY_BUDGET_RAISE is on (used in tests).
+QUERY_BUDGETS = {
+    'posts:index': 7,
+    'posts:group_list': 8,
+    'posts:profile': 8,
+    'posts:post_detail': 5,
+    'posts:post_comments': 4,
+    'posts:search': 8,
+    'posts:follow_index': 7,
+    'posts:api_index': 1,
+    'posts:api_group_list': 2,
+    'posts:api_profile': 2,
+    'posts:api_post_detail': 2,
+    'posts:feed_index_rss': 1,
+    'posts:feed_index_atom': 1,
+    'posts:feed_group_rss': 2,
+    'posts:feed_group_atom': 2,
+    'posts:feed_profile_rss': 2,
+    'posts:feed_profile_atom': 2,
+}
+QUERY_BUDGET_RAISE = False
+
+# Token-bucket rate limits (core.ratelimit) as (capacity, period seconds):
+# a client may burst `capacity` requests, refilled evenly over `period`.
+# Clients are keyed by IP and by the user id stored in the session (the
+# session cookie for anonymous clients). RATE_LIMITS are per view
+# (@rate_limit), RATE_LIMIT_DEFAULT covers every POST/PUT/PATCH/DELETE.
+# RATE_LIMIT_IP_HEADER is the request.META key holding the client IP: behind
+# a reverse proxy set it to the header the proxy sets, e.g. 'HTTP_X_REAL_IP'
+# or 'HTTP_X_FORWARDED_FOR' (its last address is used).
+RATE_LIMITS = {
+    'posts:post_create': (10, 10 * 60),
+    'posts:add_comment': (20, 60),
+    'posts:group_create': (5, 60 * 60),
+    'posts:profile_follow': (30, 60),
+}
+RATE_LIMIT_DEFAULT = (120, 60)
+RATE_LIMIT_IP_HEADER = 'REMOTE_ADDR'
+
+# Sessions are read from the cache, so rate limiting by user usually costs
+# no database query.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Per-view request metrics (core.metrics). Every worker process flushes its
+# counters into METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds and
+# /metrics (INTERNAL_IPS only) sums them in the Prometheus text format.
+# Files left by finished processes are removed when a new worker starts.
+METRICS_DIR = os.path.join(tempfile.gettempdir(), 'yatube-metrics')
+METRICS_FLUSH_INTERVAL = 10
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]